@@ -0,0 +1,177 @@
+import os
+import json
+import time
+import hashlib
+import argparse
+import multiprocessing
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+# --- Walk-Forward Backtesting ---
+# Replays historical windows through the production forecast functions to
+# measure accuracy and cost. Each fold trains on the bars up to a cut-off and
+# predicts the next close; folds are independent, so they run in a process pool.
+# A fold's outcome is cached under its training window and data hash, so
+# re-running a backtest (or extending it with new bars) only fits the new folds.
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKTEST_DIR = os.path.join(SCRIPT_DIR, 'data', 'backtest')
+BACKTEST_WORKERS = int(os.getenv("BACKTEST_WORKERS", "2"))
+MODELS = ("prophet", "lstm")
+
+def make_folds(n_rows: int, min_train: int, step: int = 1, window: int = None) -> list:
+    """
+    Returns (train_start, train_end) row ranges for a walk-forward backtest with
+    a one-bar horizon: each fold trains on rows [train_start, train_end) and is
+    scored on row train_end. Expanding folds start at row 0; with `window` the
+    training set is the trailing `window` rows instead (rolling).
+    """
+    first_end = max(min_train, window or 0)
+    return [(0 if window is None else end - window, end) for end in range(first_end, n_rows, step)]
+
+def _run_fold(model: str, train: pd.DataFrame, model_kwargs: dict) -> tuple:
+    """Fits one fold with the production forecast function. Returns (prediction, fit seconds)."""
+    from forecasting import prophet_forecast, lstm_forecast
+    forecast = prophet_forecast if model == "prophet" else lstm_forecast
+    started = time.perf_counter()
+    prediction = forecast(train, **model_kwargs)
+    return float(prediction), time.perf_counter() - started
+
+def _cache_path(ticker: str, model: str, model_kwargs: dict) -> str:
+    settings = hashlib.sha1(json.dumps(model_kwargs, sort_keys=True).encode()).hexdigest()[:8]
+    return os.path.join(BACKTEST_DIR, f"{ticker}_{model}_{settings}.json")
+
+def _fold_key(train: pd.DataFrame) -> str:
+    digest = hashlib.sha1(np.ascontiguousarray(train['Close'].to_numpy(dtype=float)).tobytes()).hexdigest()[:12]
+    return f"{train.index[0].date()}_{train.index[-1].date()}_{digest}"
+
+def _load_cache(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"   [WARN] Could not read backtest cache {path}, refitting all folds: {e}")
+        return {}
+
+def _save_cache(path: str, cache: dict):
+    os.makedirs(BACKTEST_DIR, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, path)
+
+def summarize(folds: pd.DataFrame) -> dict:
+    """Accuracy and cost metrics over the scored folds of a backtest."""
+    scored = folds.dropna(subset=['Prediction'])
+    if scored.empty:
+        return {'folds': len(folds), 'scored_folds': 0}
+    errors = scored['Prediction'] - scored['Actual']
+    predicted_move = np.sign(scored['Prediction'] - scored['Last_Close'])
+    actual_move = np.sign(scored['Actual'] - scored['Last_Close'])
+    fitted = folds[~folds['Cached']]
+    return {
+        'folds': len(folds),
+        'scored_folds': len(scored),
+        'mae': float(errors.abs().mean()),
+        'mape': float((errors.abs() / scored['Actual'].abs()).mean() * 100),
+        'directional_accuracy': float((predicted_move == actual_move).mean()),
+        'mean_fit_seconds': float(folds['Fit_Seconds'].mean()),
+        'max_fit_seconds': float(folds['Fit_Seconds'].max()),
+        'folds_fitted': len(fitted),
+        'folds_from_cache': int(folds['Cached'].sum()),
+    }
+
+def run_backtest(df: pd.DataFrame, model: str = "prophet", ticker: str = "backtest", min_train: int = 120,
+                 step: int = 1, window: int = None, max_workers: int = None, model_kwargs: dict = None,
+                 use_cache: bool = True) -> tuple:
+    """
+    Runs a walk-forward backtest of `model` ('prophet' or 'lstm') over an OHLCV frame.
+    `model_kwargs` are passed to the forecast function (e.g. {'look_back_period': 30}
+    for the LSTM) and are part of the cache key, so settings can be compared side by side.
+    Returns:
+        tuple: (folds, summary) where folds has one row per fold (cut-off date, prediction,
+        actual, last close, fit seconds, cached flag) and summary is from summarize().
+    """
+    if model not in MODELS:
+        raise ValueError(f"Unknown model '{model}'; choose from {', '.join(MODELS)}.")
+    model_kwargs = model_kwargs or {}
+    max_workers = max_workers or BACKTEST_WORKERS
+    prices = df[['Close']].dropna()
+    folds = make_folds(len(prices), min_train, step=step, window=window)
+    print(f"   [INFO] Backtesting {model} on {ticker}: {len(folds)} folds "
+          f"({'rolling ' + str(window) if window else 'expanding'} window, step {step}).")
+
+    cache_path = _cache_path(ticker, model, model_kwargs)
+    cache = _load_cache(cache_path) if use_cache else {}
+    trains = [prices.iloc[start:end] for start, end in folds]
+    keys = [_fold_key(train) for train in trains]
+    pending = [i for i, key in enumerate(keys) if key not in cache]
+    outcomes = dict(cache)
+
+    if pending:
+        print(f"   [INFO] Fitting {len(pending)} fold(s) ({len(folds) - len(pending)} cached) with {max_workers} worker(s)...")
+        started = time.perf_counter()
+        # 'spawn' for the same reason as the daily runner: TensorFlow/Stan are not fork-safe
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            futures = {i: executor.submit(_run_fold, model, trains[i], model_kwargs) for i in pending}
+            for i, future in futures.items():
+                try:
+                    prediction, fit_seconds = future.result()
+                except Exception as e:
+                    print(f"   [WARN] Fold ending {trains[i].index[-1].date()} failed: {e}")
+                    prediction, fit_seconds = float('nan'), float('nan')
+                outcomes[keys[i]] = {'prediction': prediction, 'fit_seconds': fit_seconds}
+        elapsed = time.perf_counter() - started
+        print(f"   [INFO] Fitted {len(pending)} fold(s) in {elapsed:.1f}s ({len(pending) / elapsed:.2f} folds/s).")
+        if use_cache:
+            # Failed folds are left out so the next run retries them
+            cache.update({key: outcome for key, outcome in outcomes.items() if not np.isnan(outcome['prediction'])})
+            _save_cache(cache_path, cache)
+
+    pending = set(pending)
+    rows = []
+    for i, (start, end) in enumerate(folds):
+        outcome = outcomes[keys[i]]
+        rows.append({
+            'Cutoff': prices.index[end - 1],
+            'Target_Date': prices.index[end],
+            'Prediction': outcome['prediction'],
+            'Actual': float(prices['Close'].iloc[end]),
+            'Last_Close': float(prices['Close'].iloc[end - 1]),
+            'Fit_Seconds': outcome['fit_seconds'],
+            'Cached': i not in pending,
+        })
+    results = pd.DataFrame(rows)
+    summary = summarize(results)
+    if summary.get('scored_folds'):
+        print(f"   [SUCCESS] {model} backtest on {ticker}: MAE {summary['mae']:,.2f}, MAPE {summary['mape']:.2f}%, "
+              f"directional accuracy {summary['directional_accuracy']:.1%}, "
+              f"mean fit {summary['mean_fit_seconds']:.2f}s over {summary['scored_folds']} folds.")
+    else:
+        print(f"   [WARN] {model} backtest on {ticker} produced no scored folds.")
+    return results, summary
+
+if __name__ == "__main__":
+    from ohlcv_store import load_ohlcv
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the forecast models on stored price history.")
+    parser.add_argument("ticker", help="Ticker in the local OHLCV store, e.g. BTC-USD.")
+    parser.add_argument("--model", choices=MODELS, default="prophet")
+    parser.add_argument("--min-train", type=int, default=120, help="Bars in the first training window.")
+    parser.add_argument("--step", type=int, default=5, help="Bars between fold cut-offs.")
+    parser.add_argument("--window", type=int, default=None, help="Rolling training window (default: expanding).")
+    parser.add_argument("--look-back", type=int, default=None, help="LSTM look-back period.")
+    parser.add_argument("--workers", type=int, default=BACKTEST_WORKERS)
+    parser.add_argument("--no-cache", action="store_true", help="Refit every fold.")
+    args = parser.parse_args()
+
+    history = load_ohlcv(args.ticker)
+    if history.empty:
+        print(f"❌ [ERROR] No stored history for {args.ticker}; run the daily runner's data stage first.")
+        exit(1)
+    kwargs = {'look_back_period': args.look_back} if args.model == "lstm" and args.look_back else {}
+    folds, summary = run_backtest(history, model=args.model, ticker=args.ticker, min_train=args.min_train,
+                                  step=args.step, window=args.window, max_workers=args.workers,
+                                  model_kwargs=kwargs, use_cache=not args.no_cache)
+    print(json.dumps(summary, indent=2))
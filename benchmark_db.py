@@ -0,0 +1,68 @@
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from sqlalchemy import MetaData, String, Float, DateTime, func, select
+from db_utils import engine, forecasts_table, copy_supported, copy_frame
+
+# --- Forecast Insert Benchmark ---
+# Times DataFrame.to_sql against the COPY path of db_utils on synthetic forecast
+# records, in a scratch copy of the forecasts table that is dropped afterwards.
+BENCHMARK_TABLE = 'forecasts_benchmark'
+
+def synthetic_records(rows: int) -> pd.DataFrame:
+    """Builds `rows` forecast records with every column of the forecasts table filled."""
+    rng = np.random.default_rng(0)
+    frame = {}
+    for column in forecasts_table.columns:
+        if column.name == 'id':
+            continue
+        if isinstance(column.type, DateTime):
+            frame[column.name] = pd.date_range("2020-01-01", periods=rows, freq="h")
+        elif isinstance(column.type, Float):
+            frame[column.name] = rng.normal(size=rows)
+        elif isinstance(column.type, String):
+            frame[column.name] = [f"{column.name} {i}" for i in range(rows)]
+    frame = pd.DataFrame(frame)
+    # Some missing values, as real records have
+    frame.loc[::7, 'Funding_Rate'] = np.nan
+    return frame
+
+def run_benchmark(rows: int, repeats: int = 3) -> dict:
+    table = forecasts_table.to_metadata(MetaData(), name=BENCHMARK_TABLE)
+    frame = synthetic_records(rows)
+    methods = {'to_sql': lambda: frame.to_sql(BENCHMARK_TABLE, engine, if_exists='append', index=False)}
+    if copy_supported():
+        methods['copy'] = lambda: copy_frame(frame, BENCHMARK_TABLE)
+    else:
+        print(f"   [WARN] COPY is not available on this backend ({engine.dialect.name}+{engine.dialect.driver}); timing to_sql only.")
+
+    timings = {}
+    table.create(engine, checkfirst=True)
+    try:
+        for name, insert in methods.items():
+            best = float('inf')
+            for _ in range(repeats):
+                with engine.begin() as connection:
+                    connection.execute(table.delete())
+                started = time.perf_counter()
+                insert()
+                best = min(best, time.perf_counter() - started)
+            with engine.connect() as connection:
+                stored = connection.execute(select(func.count()).select_from(table)).scalar()
+            if stored != rows:
+                raise RuntimeError(f"{name} stored {stored} of {rows} rows")
+            timings[name] = best
+            print(f"   [INFO] {name:>6}: {rows} rows in {best * 1000:.1f}ms ({rows / best:,.0f} rows/s)")
+    finally:
+        table.drop(engine, checkfirst=True)
+    return timings
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark bulk inserts into the forecasts table.")
+    parser.add_argument("--rows", type=int, default=10000, help="Number of synthetic records per insert (default: 10000).")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per method; the best time is reported (default: 3).")
+    args = parser.parse_args()
+    timings = run_benchmark(args.rows, args.repeats)
+    if 'copy' in timings:
+        print(f"   [SUCCESS] COPY is {timings['to_sql'] / timings['copy']:.1f}x faster than to_sql.")
@@ -0,0 +1,82 @@
+import json
+from llm_cache import cached_completion
+from analyst import REPORT_FORMAT, build_analysis_results, failed_analysis_results, get_client
+from strategy_agent import TRADE_FORMAT, default_recommendation, is_valid_recommendation
+
+# --- Combined Analyst + Strategist ---
+# Produces the analyst's report and the strategist's trade setup from one request:
+# the briefing is sent once and both parts come back in a single JSON object, so a
+# coin costs one round trip and one copy of the prompt instead of two.
+
+SYSTEM_PROMPT = """
+    You are an expert crypto market analyst and quantitative trading strategist. Your tone is objective, data-driven, and insightful. Your task is to synthesize a comprehensive set of market data into a multi-part daily report and a high-probability trade setup for the next 24-72 hour horizon.
+
+    CRITICAL INSTRUCTION: Base your analysis *only* on the data provided. Analyze the confluence between technical momentum, derivatives positioning, on-chain value, and social sentiment.
+
+    You MUST provide your response in a single, valid JSON object with exactly two keys, "report" and "trade".
+
+    "report" is an object with the following five keys:""" + REPORT_FORMAT + """
+    "trade" is an object with the following keys:""" + TRADE_FORMAT
+
+def is_valid_combined(response) -> bool:
+    """A usable response has a report object and a trade setup that passes the strategist's validation."""
+    return (isinstance(response, dict) and isinstance(response.get("report"), dict)
+            and is_valid_recommendation(response.get("trade")))
+
+def get_combined_report(daily_briefing_data: dict) -> tuple:
+    """
+    Returns (analysis_results, trade_recommendation) in the same shapes as
+    analyst.get_daily_analysis and strategy_agent.get_trade_recommendation.
+    """
+    coin_name = daily_briefing_data.get("coin_name", "the asset")
+    default_trade = default_recommendation()
+    client = get_client()
+    if not client:
+        default_trade["rationale"] = "Strategy generation failed: Configuration error."
+        return { "summary": "AI analysis failed.", "hypothesis": "Configuration error.", "news_links": "[]" }, default_trade
+
+    print(f"   [INFO] Briefing combined AI Analyst/Strategist on {coin_name}...")
+    user_prompt = f"""
+    Generate a comprehensive market analysis report and a trade recommendation for {coin_name} based on the following data.
+    Directly cite the data points in your analysis, especially the advanced metrics.
+
+    ```json
+    {json.dumps(daily_briefing_data, indent=2)}
+    ```
+    """
+
+    try:
+        content = cached_completion(
+            client,
+            model="gpt-4-turbo",
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": user_prompt}
+            ],
+            response_format={"type": "json_object"},
+            temperature=0.3,
+            # Only responses with both parts well-formed are cached
+            validate=lambda content: is_valid_combined(json.loads(content))
+        )
+        response = json.loads(content)
+    except Exception as e:
+        print(f"❌ [ERROR] Combined AI Analyst/Strategist API call failed: {e}")
+        default_trade["rationale"] = f"Strategy generation failed due to API or processing error: {e}"
+        return failed_analysis_results(e), default_trade
+
+    report = response.get("report") if isinstance(response, dict) else None
+    trade = response.get("trade") if isinstance(response, dict) else None
+    if isinstance(report, dict):
+        analysis_results = build_analysis_results(report, daily_briefing_data)
+    else:
+        print(f"❌ [ERROR] Combined AI response has no report object. Response: {content}")
+        analysis_results = failed_analysis_results("Invalid JSON structure.")
+    if is_valid_recommendation(trade):
+        trade_recommendation = trade
+    else:
+        print(f"❌ [ERROR] Combined AI response missing required trade keys. Response: {content}")
+        default_trade["rationale"] = "Strategy generation failed: Invalid JSON structure."
+        trade_recommendation = default_trade
+    if is_valid_combined(response):
+        print(f"   [SUCCESS] Combined AI report and trade recommendation for {coin_name} generated.")
+    return analysis_results, trade_recommendation
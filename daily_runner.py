@@ -3,10 +3,12 @@ from datetime import datetime
 import numpy as np
 import os
 import json
-import openai
 from frozendict import frozendict
 from dotenv import load_dotenv
 import logging
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 
 # --- Setup Logging ---
 logging.basicConfig(level=logging.INFO)
@@ -14,7 +16,6 @@ logger = logging.getLogger(__name__)
 
 # --- Load Environment and Keys ---
 load_dotenv()
-openai.api_key = os.getenv("OPENAI_API_KEY")
 news_api_key = os.getenv("NEWS_API_KEY")
 
 # --- Robust Key Check ---
@@ -32,13 +33,21 @@ if missing_keys:
 # --- Module Imports ---
 try:
     from data_utils import fetch_data
-    from forecasting import prophet_forecast, lstm_forecast, prophet_forecast_highs
-    from sentiment import get_news_sentiment
-    from db_utils import init_db, save_forecast_results
+    from ohlcv_store import update_ohlcv_batch, get_ohlcv, load_ohlcv
+    from indicators import compute_indicators_batch
+    from indicator_state import update_indicator_state, verify_state
+    from forecasting import prophet_forecast_targets, lstm_forecast, lstm_forecast_multi
+    from sentiment import get_news_sentiment, get_news_sentiment_batch
+    # db_utils is imported where the llm stage needs it: it connects on import and
+    # requires database configuration, which data and forecast runs shouldn't
+    from frame_store import save_market_data, save_snapshot, load_market_data, load_snapshots, save_forecast, load_forecast
     # analyst.py generates the existing reports
     from analyst import get_daily_analysis 
     # NEW: IMPORT THE STRATEGY AGENT
     from strategy_agent import get_trade_recommendation 
+    from combined_agent import get_combined_report
+    from llm_cache import cache_stats as llm_cache_stats
+    from llm_executor import run_llm_calls
 except ImportError as e:
     logger.error(f" ❌  [FATAL] Failed to import a required module: {e}. Exiting.")
     exit(1)
@@ -48,6 +57,23 @@ except ImportError as e:
 COINS = {"BTC-USD": "Bitcoin", "ETH-USD": "Ethereum", "XRP-USD": "XRP"}
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(SCRIPT_DIR, 'data')
+# Number of worker processes for the per-coin pipeline (1 = sequential)
+RUNNER_WORKERS = int(os.getenv("RUNNER_WORKERS", "1"))
+# Pipeline stages, in run order:
+#   data     - refresh prices, indicators and provider data, and save the coin's frames
+#   forecast - Prophet and LSTM forecasts
+#   llm      - news sentiment, AI analysis and trade recommendation, and the database record
+# Skipped stages reuse what the last run stored (frames on disk, forecasts in the database).
+STAGES = ("data", "forecast", "llm")
+# Train one shared LSTM over all coins in the parent process instead of one network per coin
+LSTM_MULTI_ASSET = os.getenv("LSTM_MULTI_ASSET", "0") == "1"
+# Ask for the analyst report and the trade recommendation in one LLM request per coin
+COMBINED_AGENT = os.getenv("COMBINED_AGENT", "0") == "1"
+# Advance the persisted incremental indicator state each data run. Nothing reads the state
+# yet (fetch_data and the dashboard use the batch engine), so it is opt-in.
+INDICATOR_STATE = os.getenv("INDICATOR_STATE", "0") == "1"
+# Score news sentiment for all coins in a few batched LLM requests instead of one per coin
+SENTIMENT_BATCH = os.getenv("SENTIMENT_BATCH", "1") == "1"
 
 def default_json_serializer(obj):
     """Helper for JSON serialization of complex types."""
@@ -55,141 +81,361 @@ def default_json_serializer(obj):
     if isinstance(obj, frozendict): return dict(obj)
     raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
 
-def run_daily_analysis():
-    logger.info(" ✅  [START] Kicking off daily crypto forecasting run...")
-    
-    # Initialize DB connection and schema
+def load_stored_inputs(ticker: str) -> tuple:
+    """Returns the indicator frame and latest provider snapshot saved by the last data stage."""
+    market_data = load_market_data(ticker)
+    snapshots = load_snapshots(ticker)
+    provider_snapshot = snapshots.iloc[-1].to_dict() if snapshots is not None and not snapshots.empty else {}
+    return (market_data if market_data is not None else pd.DataFrame()), provider_snapshot
+
+def load_stored_forecasts() -> dict:
+    """
+    Returns {ticker: (prophet_price, lstm_price, high_forecasts_list)} for every coin in COINS
+    from the forecast the last forecast stage stored for it, or from the coin's latest
+    database record when that is newer (or no forecast file exists).
+    """
+    from db_utils import load_forecast_results
+    stored, record_dates = {}, {}
+    history = load_forecast_results()
+    if not history.empty:
+        # Records are loaded newest first
+        for _, record in history.drop_duplicates(subset='Coin', keep='first').iterrows():
+            highs = json.loads(record['High_Forecast_5_Day']) if record['High_Forecast_5_Day'] else []
+            stored[record['Coin']] = (record['Prophet_Forecast'], record['LSTM_Forecast'], highs)
+            record_dates[record['Coin']] = pd.Timestamp(record['Date'])
+    for ticker in COINS:
+        try:
+            forecast = load_forecast(ticker)
+        except Exception as e:
+            logger.warning(f"   [WARN] Could not read the stored forecast for {ticker}: {e}")
+            continue
+        if forecast is not None and (ticker not in record_dates or forecast['run_time'] >= record_dates[ticker]):
+            stored[ticker] = (forecast['prophet_forecast'], forecast['lstm_forecast'], forecast['high_forecast_5_day'])
+    return stored
+
+def process_coin(ticker: str, name: str, run_time: datetime, price_data: pd.DataFrame = None,
+                 stages: tuple = STAGES, stored_forecast: tuple = None, lstm_price: float = None,
+                 sentiment: tuple = None):
+    """
+    Runs the per-coin pipeline (data, forecasts, sentiment) and returns
+    {'briefing': AI briefing, 'record': database record without the AI fields},
+    or None if the coin was skipped, failed, or the llm stage (which completes the
+    record) was not requested. The AI agents run afterwards for all coins at once.
+    `price_data` is the coin's precomputed OHLCV+indicator frame, if available.
+    `stored_forecast` is the coin's last saved forecasts, used when the forecast stage is skipped.
+    `lstm_price` is a forecast already made by the shared multi-asset LSTM, if any.
+    `sentiment` is the coin's (score, top_articles) from the batched sentiment pass, if any.
+    Module-level so it can be pickled and dispatched to a worker process.
+    """
+    logger.info(f"\nProcessing {ticker} ({name})...")
     try:
-        init_db()
+        if "data" in stages:
+            market_data, provider_snapshot = fetch_data(ticker, price_data=price_data)
+        else:
+            market_data, provider_snapshot = load_stored_inputs(ticker)
+        # Check for minimum data required (e.g., 61 days for LSTM lookback)
+        if market_data.empty or len(market_data) < 61:
+            logger.warning(f"   [WARN] Insufficient data for {ticker}. Skipping.")
+            return None
+        
+        if "data" in stages:
+            # Save detailed data and the provider snapshot for the dashboard
+            save_market_data(ticker, market_data)
+            save_snapshot(ticker, provider_snapshot, run_time)
+        
+        # Join the provider snapshot onto the latest bar only
+        latest_data = pd.concat([market_data.iloc[-1], pd.Series(provider_snapshot, dtype=object)])
+        
+        if "forecast" in stages:
+            # Both Prophet models (next-day Close, 5-day High) are fitted concurrently in one call
+            prophet_results = prophet_forecast_targets(market_data, {'Close': 1, 'High': 5}, ticker=ticker)
+            prophet_price = float(prophet_results['Close'][-1]['yhat']) if prophet_results['Close'] else np.nan
+            high_forecasts_list = prophet_results['High']
+            if lstm_price is None:
+                lstm_price = lstm_forecast(market_data, ticker=ticker)
+            # Keep this run's forecasts for a later llm-only run
+            try:
+                save_forecast(ticker, {
+                    "prophet_forecast": prophet_price,
+                    "lstm_forecast": float(lstm_price),
+                    "high_forecast_5_day": json.loads(json.dumps(high_forecasts_list, default=default_json_serializer))
+                }, run_time)
+            except Exception as e:
+                logger.warning(f"   [WARN] Could not store the forecasts for {ticker}: {e}")
+        else:
+            prophet_price, lstm_price, high_forecasts_list = stored_forecast or (np.nan, np.nan, [])
+
+        if "llm" not in stages:
+            logger.info(f"   [INFO] Stages {', '.join(stages)} complete for {ticker}.")
+            return None
+        if "forecast" not in stages and stored_forecast is None:
+            logger.warning(f"   [WARN] No stored forecasts for {ticker}; forecast fields will be empty.")
+
+        if sentiment is None:
+            sentiment = get_news_sentiment(coin_ticker=ticker, coin_name=name, api_key=news_api_key)
+        sentiment_score, top_headlines = sentiment
+
+        # Prepare a comprehensive briefing for the AI (Used by Analyst and Strategist)
+        # Ensure ALL relevant data points are included for the AI prompts.
+        daily_briefing_data = {
+            "coin_name": name,
+            "actual_price": latest_data.get("Close", 0.0),
+            "prophet_forecast": prophet_price,
+            "lstm_forecast": lstm_price,
+            "sentiment_score": sentiment_score,
+            "rsi": latest_data.get("RSI", 0.0),
+            "macd": latest_data.get("MACD", 0.0),
+            "funding_rate": latest_data.get("Funding_Rate", 0.0),
+            "open_interest": latest_data.get("Open_Interest", 0.0),
+            "long_short_ratio": latest_data.get("Long_Short_Ratio", 0.0),
+            "mvrv_ratio": latest_data.get("MVRV_Ratio", 0.0),
+            "social_dominance": latest_data.get("Social_Dominance", 0.0),
+            "daily_active_addresses": latest_data.get("Daily_Active_Addresses", 0.0),
+            "galaxy_score": latest_data.get("Galaxy_Score", 0.0),
+            "alt_rank": latest_data.get("Alt_Rank", 0.0),
+            # Include advanced metrics (ensure these exist in your fetch_data output)
+            "Leverage_Ratio": latest_data.get("Leverage_Ratio", 0.0),
+            "Futures_Volume_24h": latest_data.get("Futures_Volume_24h", 0.0),
+            "Exchange_Supply_Ratio": latest_data.get("Exchange_Supply_Ratio", 0.0),
+            "top_headlines": top_headlines
+        }
+
+        # Assemble the market and forecast part of the record; the AI fields are added by complete_records
+        result = {
+            "Date": run_time, # Use the consistent timestamp
+            "Coin": ticker,
+            
+            # --- Standard Market Data & Forecasts ---
+            "Actual_Price": latest_data.get("Close", 0.0),
+            "Prophet_Forecast": prophet_price,
+            "LSTM_Forecast": lstm_price,
+            "Sentiment_Score": sentiment_score,
+            "RSI": latest_data.get("RSI", 0.0),
+            "MACD": latest_data.get("MACD", 0.0),
+            "All_Time_High": latest_data.get("All_Time_High_Real", 0.0),
+            "High_Forecast_5_Day": json.dumps(high_forecasts_list, default=default_json_serializer),
+            
+            # --- Professional Data Sources (CoinGlass, Santiment, LunarCrush) ---
+            "Funding_Rate": latest_data.get("Funding_Rate", 0.0),
+            "Open_Interest": latest_data.get("Open_Interest", 0.0),
+            "Long_Short_Ratio": latest_data.get("Long_Short_Ratio", 0.0),
+            "MVRV_Ratio": latest_data.get("MVRV_Ratio", 0.0),
+            "Social_Dominance": latest_data.get("Social_Dominance", 0.0),
+            "Daily_Active_Addresses": latest_data.get("Daily_Active_Addresses", 0.0),
+            "Galaxy_Score": latest_data.get("Galaxy_Score", 0.0),
+            "Alt_Rank": latest_data.get("Alt_Rank", 0.0),
+            "Exchange_Net_Flow": latest_data.get("Exchange_Net_Flow", 0.0),
+
+            # --- Advanced Metrics (Retained from your existing setup) ---
+            "Leverage_Ratio": latest_data.get("Leverage_Ratio", 0.0),
+            "Futures_Volume_24h": latest_data.get("Futures_Volume_24h", 0.0),
+            "Exchange_Supply_Ratio": latest_data.get("Exchange_Supply_Ratio", 0.0)
+        }
+        return {"briefing": daily_briefing_data, "record": result}
     except Exception as e:
-        logger.error(f" ❌  [FATAL] Database initialization failed: {e}. Exiting.")
-        exit(1)
+        logger.error(f" ❌  [ERROR] An unexpected error occurred while processing {ticker}: {e}", exc_info=True)
+        return None
+
+def ai_record_fields(analysis_results: dict, trade_recommendation: dict) -> dict:
+    """Maps the analyst and strategist outputs onto the AI columns of a database record."""
+    return {
+        # --- AI Analysis (Basic summary from the Guide documentation) ---
+        "analysis_summary": analysis_results.get("summary"),
+        "analysis_hypothesis": analysis_results.get("hypothesis"),
+        "analysis_news_links": analysis_results.get("news_links"),
+        "user_feedback": None,
+        "user_correction": None,
+
+        # --- AI Report (Your existing custom fields - RETAINED) ---
+        "report_title": analysis_results.get("report_title"),
+        "report_recap": analysis_results.get("report_recap"),
+        "report_bullish": analysis_results.get("report_bullish"),
+        "report_bearish": analysis_results.get("report_bearish"),
+        "report_hypothesis": analysis_results.get("report_hypothesis"),
+        
+        # --- NEW: AI Trade Recommendations (from Strategy Agent) ---
+        "trade_action": trade_recommendation.get("action"),
+        "trade_entry_range": trade_recommendation.get("entry_range"),
+        "trade_tp1": trade_recommendation.get("tp1"),
+        "trade_tp2": trade_recommendation.get("tp2"),
+        "trade_sl": trade_recommendation.get("sl"),
+        "trade_confidence": trade_recommendation.get("confidence"),
+        "trade_rationale": trade_recommendation.get("rationale")
+    }
+
+def complete_records(prepared: list, combined: bool = False) -> list:
+    """
+    Runs the analyst and strategist for every prepared coin concurrently (bounded by
+    LLM_MAX_CONCURRENCY and the LLM token budget) and returns the completed records.
+    With `combined` each coin gets a single request returning both the report and the trade.
+    """
+    calls = {}
+    for coin in prepared:
+        ticker = coin["record"]["Coin"]
+        if combined:
+            calls[(ticker, "combined")] = (get_combined_report, (coin["briefing"],))
+        else:
+            # 1. The existing AI Analysis (Descriptive Report) and 2. the AI Trade Recommendation (Prescriptive Strategy)
+            calls[(ticker, "analysis")] = (get_daily_analysis, (coin["briefing"],))
+            calls[(ticker, "trade")] = (get_trade_recommendation, (coin["briefing"],))
+    responses = run_llm_calls(calls)
+    records = []
+    for coin in prepared:
+        ticker = coin["record"]["Coin"]
+        if combined:
+            analysis_results, trade_recommendation = responses.get((ticker, "combined")) or ({}, {})
+        else:
+            analysis_results = responses.get((ticker, "analysis")) or {}
+            trade_recommendation = responses.get((ticker, "trade")) or {}
+        records.append({**coin["record"], **ai_record_fields(analysis_results, trade_recommendation)})
+    return records
+
+def run_daily_analysis(max_workers: int = None, verify_indicators: bool = False, stages: tuple = STAGES,
+                       multi_asset_lstm: bool = None, combined_agent: bool = None, indicator_state: bool = None):
+    """
+    Runs the daily pipeline for every coin in COINS and saves all records in a single batch.
+    With max_workers > 1 the per-coin pipelines run in parallel in a process pool.
+    With indicator_state (default: INDICATOR_STATE) the persisted incremental indicator
+    state is advanced with the new bars; verify_indicators implies it and also checks the
+    state against a batch recomputation. `stages` selects which parts of the pipeline run
+    (see STAGES); records are only saved when the llm stage runs. With multi_asset_lstm
+    one shared LSTM is trained over all coins up front (default: LSTM_MULTI_ASSET). With
+    combined_agent the report and trade come from one LLM request per coin (default: COMBINED_AGENT).
+    """
+    logger.info(f" ✅  [START] Kicking off daily crypto forecasting run (stages: {', '.join(stages)})...")
+    max_workers = max_workers or RUNNER_WORKERS
+    
+    # Initialize DB connection and schema (only the llm stage reads or writes records)
+    if "llm" in stages:
+        try:
+            from db_utils import init_db
+            init_db()
+        except Exception as e:
+            logger.error(f" ❌  [FATAL] Database initialization failed: {e}. Exiting.")
+            exit(1)
 
     # Use a consistent timestamp for the entire run
     run_time = datetime.now()
     os.makedirs(DATA_DIR, exist_ok=True)
-    all_results = []
+    prepared = []
 
-    for ticker, name in COINS.items():
-        logger.info(f"\nProcessing {ticker} ({name})...")
+    # Refresh price history for the whole universe in a few batched downloads and
+    # compute indicators for all coins in one vectorized pass; coins the batch
+    # couldn't cover fall back to their own download in fetch_data.
+    prefetched, price_frames = {}, {}
+    if "data" in stages:
         try:
-            market_data = fetch_data(ticker)
-            # Check for minimum data required (e.g., 61 days for LSTM lookback)
-            if market_data.empty or len(market_data) < 61:
-                logger.warning(f"   [WARN] Insufficient data for {ticker}. Skipping.")
-                continue
-            
-            # Save detailed data for the dashboard
-            detailed_data_path = os.path.join(DATA_DIR, f"{ticker}_data.csv")
-            market_data.to_csv(detailed_data_path)
-            
-            latest_data = market_data.iloc[-1]
-            
-            # Run forecasts and sentiment analysis
-            prophet_price = prophet_forecast(market_data.copy())
-            lstm_price = lstm_forecast(market_data.copy())
-            high_forecasts_list = prophet_forecast_highs(market_data.copy(), periods=5)
-            sentiment_score, top_headlines = get_news_sentiment(coin_ticker=ticker, coin_name=name, api_key=news_api_key)
-
-            # Prepare a comprehensive briefing for the AI (Used by Analyst and Strategist)
-            # Ensure ALL relevant data points are included for the AI prompts.
-            daily_briefing_data = {
-                "coin_name": name,
-                "actual_price": latest_data.get("Close", 0.0),
-                "prophet_forecast": prophet_price,
-                "lstm_forecast": lstm_price,
-                "sentiment_score": sentiment_score,
-                "rsi": latest_data.get("RSI", 0.0),
-                "macd": latest_data.get("MACD", 0.0),
-                "funding_rate": latest_data.get("Funding_Rate", 0.0),
-                "open_interest": latest_data.get("Open_Interest", 0.0),
-                "long_short_ratio": latest_data.get("Long_Short_Ratio", 0.0),
-                "mvrv_ratio": latest_data.get("MVRV_Ratio", 0.0),
-                "social_dominance": latest_data.get("Social_Dominance", 0.0),
-                "daily_active_addresses": latest_data.get("Daily_Active_Addresses", 0.0),
-                "galaxy_score": latest_data.get("Galaxy_Score", 0.0),
-                "alt_rank": latest_data.get("Alt_Rank", 0.0),
-                # Include advanced metrics (ensure these exist in your fetch_data output)
-                "Leverage_Ratio": latest_data.get("Leverage_Ratio", 0.0),
-                "Futures_Volume_24h": latest_data.get("Futures_Volume_24h", 0.0),
-                "Exchange_Supply_Ratio": latest_data.get("Exchange_Supply_Ratio", 0.0),
-                "top_headlines": top_headlines
-            }
+            prefetched = update_ohlcv_batch(list(COINS))
+            price_frames = compute_indicators_batch({ticker: get_ohlcv(ticker, refresh=False) for ticker in prefetched})
+        except Exception as e:
+            logger.warning(f"   [WARN] Batched price download failed, falling back to per-coin downloads: {e}")
+            prefetched, price_frames = {}, {}
 
-            # 1. Get the existing AI Analysis (Descriptive Report)
-            analysis_results = get_daily_analysis(daily_briefing_data)
-
-            # 2. Get the NEW AI Trade Recommendation (Prescriptive Strategy)
-            trade_recommendation = get_trade_recommendation(daily_briefing_data)
-
-            # Assemble the final, complete record for the database
-            result = {
-                "Date": run_time, # Use the consistent timestamp
-                "Coin": ticker,
-                
-                # --- Standard Market Data & Forecasts ---
-                "Actual_Price": latest_data.get("Close", 0.0),
-                "Prophet_Forecast": prophet_price,
-                "LSTM_Forecast": lstm_price,
-                "Sentiment_Score": sentiment_score,
-                "RSI": latest_data.get("RSI", 0.0),
-                "MACD": latest_data.get("MACD", 0.0),
-                "All_Time_High": latest_data.get("All_Time_High_Real", 0.0),
-                "High_Forecast_5_Day": json.dumps(high_forecasts_list, default=default_json_serializer),
-                
-                # --- Professional Data Sources (CoinGlass, Santiment, LunarCrush) ---
-                "Funding_Rate": latest_data.get("Funding_Rate", 0.0),
-                "Open_Interest": latest_data.get("Open_Interest", 0.0),
-                "Long_Short_Ratio": latest_data.get("Long_Short_Ratio", 0.0),
-                "MVRV_Ratio": latest_data.get("MVRV_Ratio", 0.0),
-                "Social_Dominance": latest_data.get("Social_Dominance", 0.0),
-                "Daily_Active_Addresses": latest_data.get("Daily_Active_Addresses", 0.0),
-                "Galaxy_Score": latest_data.get("Galaxy_Score", 0.0),
-                "Alt_Rank": latest_data.get("Alt_Rank", 0.0),
-                "Exchange_Net_Flow": latest_data.get("Exchange_Net_Flow", 0.0),
-
-                # --- Advanced Metrics (Retained from your existing setup) ---
-                "Leverage_Ratio": latest_data.get("Leverage_Ratio", 0.0),
-                "Futures_Volume_24h": latest_data.get("Futures_Volume_24h", 0.0),
-                "Exchange_Supply_Ratio": latest_data.get("Exchange_Supply_Ratio", 0.0),
-
-                # --- AI Analysis (Basic summary from the Guide documentation) ---
-                "analysis_summary": analysis_results.get("summary"),
-                "analysis_hypothesis": analysis_results.get("hypothesis"),
-                "analysis_news_links": analysis_results.get("news_links"),
-                "user_feedback": None,
-                "user_correction": None,
-
-                # --- AI Report (Your existing custom fields - RETAINED) ---
-                "report_title": analysis_results.get("report_title"),
-                "report_recap": analysis_results.get("report_recap"),
-                "report_bullish": analysis_results.get("report_bullish"),
-                "report_bearish": analysis_results.get("report_bearish"),
-                "report_hypothesis": analysis_results.get("report_hypothesis"),
-                
-                # --- NEW: AI Trade Recommendations (from Strategy Agent) ---
-                "trade_action": trade_recommendation.get("action"),
-                "trade_entry_range": trade_recommendation.get("entry_range"),
-                "trade_tp1": trade_recommendation.get("tp1"),
-                "trade_tp2": trade_recommendation.get("tp2"),
-                "trade_sl": trade_recommendation.get("sl"),
-                "trade_confidence": trade_recommendation.get("confidence"),
-                "trade_rationale": trade_recommendation.get("rationale")
-            }
-            all_results.append(result)
+    stored_forecasts = load_stored_forecasts() if "llm" in stages and "forecast" not in stages else {}
+
+    # One training job with large batches over every coin's windows; coins it can't
+    # forecast fall back to their own per-coin LSTM in process_coin
+    lstm_prices = {}
+    multi_asset_lstm = LSTM_MULTI_ASSET if multi_asset_lstm is None else multi_asset_lstm
+    if "forecast" in stages and multi_asset_lstm:
+        try:
+            frames = price_frames if "data" in stages else {ticker: load_stored_inputs(ticker)[0] for ticker in COINS}
+            lstm_prices = {ticker: price for ticker, price in lstm_forecast_multi(frames).items() if not np.isnan(price)}
         except Exception as e:
-            logger.error(f" ❌  [ERROR] An unexpected error occurred while processing {ticker}: {e}", exc_info=True)
-            continue
+            logger.warning(f"   [WARN] Shared LSTM failed, falling back to per-coin LSTMs: {e}")
+
+    # News sentiment for the whole universe is scored up front in a few batched requests
+    # (coins without a batched result fall back to their own call in process_coin)
+    sentiments = {}
+    if "llm" in stages and SENTIMENT_BATCH:
+        try:
+            sentiments = get_news_sentiment_batch(COINS, news_api_key)
+        except Exception as e:
+            logger.warning(f"   [WARN] Batched sentiment failed, scoring each coin separately: {e}")
+
+    # Advance the persisted incremental indicator state with today's new bars only
+    indicator_state = (INDICATOR_STATE if indicator_state is None else indicator_state) or verify_indicators
+    for ticker in (prefetched if indicator_state else []):
+        try:
+            history = load_ohlcv(ticker)
+            update_indicator_state(ticker, history)
+            if verify_indicators:
+                verify_state(ticker, history)
+        except Exception as e:
+            logger.warning(f"   [WARN] Could not update indicator state for {ticker}: {e}")
+
+    if max_workers <= 1:
+        for ticker, name in COINS.items():
+            result = process_coin(ticker, name, run_time, price_frames.get(ticker), stages,
+                                  stored_forecasts.get(ticker), lstm_prices.get(ticker), sentiments.get(ticker))
+            if result is not None:
+                prepared.append(result)
+    else:
+        workers = min(max_workers, len(COINS))
+        logger.info(f"   [INFO] Processing {len(COINS)} coins in parallel with {workers} worker processes...")
+        # 'spawn' gives each worker a clean interpreter; forking after TensorFlow/Stan
+        # have been initialized in the parent is not safe.
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            futures = {
+                ticker: executor.submit(process_coin, ticker, name, run_time, price_frames.get(ticker), stages,
+                                        stored_forecasts.get(ticker), lstm_prices.get(ticker), sentiments.get(ticker))
+                for ticker, name in COINS.items()
+            }
+            # Collect in COINS order so the saved batch is deterministic
+            for ticker, future in futures.items():
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # process_coin isolates its own errors; this only catches worker crashes
+                    logger.error(f" ❌  [ERROR] Worker process failed while processing {ticker}: {e}")
+                    continue
+                if result is not None:
+                    prepared.append(result)
+
+    # The analyst and strategist calls for all coins are dispatched together once every briefing is ready
+    combined_agent = COMBINED_AGENT if combined_agent is None else combined_agent
+    all_results = complete_records(prepared, combined=combined_agent) if prepared else []
             
     logger.info("\n ✅  [FINISH] Daily processing complete.")
+    if "llm" in stages:
+        try:
+            stats = llm_cache_stats()
+            logger.info(f"   [INFO] LLM cache: {stats['hits']} hits, {stats['misses']} misses (all time), {stats['entries']} cached responses.")
+        except Exception as e:
+            logger.warning(f"   [WARN] Could not read LLM cache stats: {e}")
     if all_results:
         results_df = pd.DataFrame(all_results)
         try:
+            from db_utils import save_forecast_results
             save_forecast_results(results_df)
         except Exception as e:
             logger.error(f" ❌  [ERROR] Failed to save results to the database: {e}")
+    elif "llm" not in stages:
+        logger.info("   [INFO] The llm stage was not run, so no records were saved to the database.")
     else:
         logger.warning("\n[WARN] No results were generated. Database not updated.")
 
 if __name__ == "__main__":
-    run_daily_analysis()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Run the daily crypto forecasting pipeline.")
+    parser.add_argument("--workers", type=int, default=RUNNER_WORKERS,
+                        help="Number of coins to process in parallel (default: RUNNER_WORKERS env var or 1).")
+    parser.add_argument("--indicator-state", action="store_true", default=INDICATOR_STATE,
+                        help="Advance the persisted incremental indicator state (default: INDICATOR_STATE env var).")
+    parser.add_argument("--verify-indicators", action="store_true",
+                        help="Advance the incremental indicator state and check it against a full batch recomputation.")
+    parser.add_argument("--stages", default=",".join(STAGES),
+                        help=f"Comma-separated pipeline stages to run (default: {','.join(STAGES)}).")
+    parser.add_argument("--multi-asset-lstm", action="store_true", default=LSTM_MULTI_ASSET,
+                        help="Train one shared LSTM over all coins instead of one per coin (default: LSTM_MULTI_ASSET env var).")
+    parser.add_argument("--combined-agent", action="store_true", default=COMBINED_AGENT,
+                        help="Get the analyst report and trade recommendation from one LLM call per coin (default: COMBINED_AGENT env var).")
+    args = parser.parse_args()
+    stages = tuple(stage.strip() for stage in args.stages.split(",") if stage.strip())
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown or not stages:
+        parser.error(f"--stages takes one or more of: {', '.join(STAGES)}.")
+    # Keep the pipeline order regardless of how the stages were listed
+    stages = tuple(stage for stage in STAGES if stage in stages)
+    run_daily_analysis(max_workers=args.workers, verify_indicators=args.verify_indicators, stages=stages,
+                       multi_asset_lstm=args.multi_asset_lstm, combined_agent=args.combined_agent,
+                       indicator_state=args.indicator_state)
\ No newline at end of file
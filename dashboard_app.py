@@ -3,19 +3,26 @@ load_dotenv() # Load variables from .env file FIRST
 
 import streamlit as st
 import pandas as pd
-import os
 import json
 import numpy as np
 from db_utils import load_forecast_results, update_feedback
+from frame_store import load_market_data, load_snapshots
 # RETAINED: Existing imports for dynamic chart analysis
 from chart_analyst import analyze_bollinger_bands, analyze_rsi
 
 # --- Page Configuration ---
 st.set_page_config(page_title="305 Crypto Forecast", page_icon="📈", layout="wide")
 
-# --- Robust Local Path Configuration ---
-SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-DATA_DIR = os.path.join(SCRIPT_DIR, 'data')
+# Columns the charts and metric sections read from the detailed indicator data
+CHART_COLUMNS = [
+    'Open', 'High', 'Low', 'Close', 'Volume', 'SMA', 'EMA', 'RSI', 'MACD', 'MACD_Signal',
+    'BB_High', 'BB_Low', 'Stoch_k', 'Stoch_d', 'OBV'
+]
+# Provider snapshot fields shown in the on-chain & fundamental section
+SNAPSHOT_COLUMNS = [
+    'Transaction_Volume_24h', 'Circulating_Supply', 'Market_Cap_Rank',
+    'Community_Score', 'Developer_Score', 'Sentiment_Up_Percentage'
+]
 
 # --- Caching Functions ---
 @st.cache_data(ttl=3600)
@@ -24,15 +31,21 @@ def get_historical_data():
     return load_forecast_results()
 
 @st.cache_data(ttl=3600)
-def load_chart_data(ticker):
-    """Loads the detailed indicator data from the local CSV file."""
-    file_path = os.path.join(DATA_DIR, f"{ticker}_data.csv")
-    if os.path.exists(file_path):
-        try:
-            return pd.read_csv(file_path, index_col=0, parse_dates=True)
-        except Exception:
-            return None
-    return None
+def load_chart_data(ticker, columns=None):
+    """Loads the detailed indicator data (only `columns`, if given) from the local data store."""
+    try:
+        return load_market_data(ticker, columns=columns)
+    except Exception:
+        return None
+
+@st.cache_data(ttl=3600)
+def load_snapshot_data(ticker):
+    """Loads the per-date provider snapshot history, falling back to legacy frames that carried it as columns."""
+    try:
+        snapshots = load_snapshots(ticker, columns=SNAPSHOT_COLUMNS)
+        return snapshots if snapshots is not None else load_market_data(ticker, columns=SNAPSHOT_COLUMNS)
+    except Exception:
+        return None
 
 # RETAINED: Existing Fibonacci Calculation Function
 def calculate_fibonacci_levels(df: pd.DataFrame):
@@ -106,7 +119,7 @@ st.sidebar.header("Dashboard Options")
 
 if not latest_forecast_df.empty:
     selected_coin = st.sidebar.selectbox("Select a Cryptocurrency", latest_forecast_df['Coin'].unique())
-    chart_data = load_chart_data(selected_coin)
+    chart_data = load_chart_data(selected_coin, columns=CHART_COLUMNS)
     # Ensure the specific coin forecast exists
     coin_forecast_series = latest_forecast_df[latest_forecast_df['Coin'] == selected_coin]
     if not coin_forecast_series.empty:
@@ -407,7 +420,8 @@ else:
 # ... (The "On-Chain & Fundamental Indicators" and "Raw Data Viewer" sections remain unchanged) ...
 
 st.header(f"On-Chain & Fundamental Indicators for {selected_coin}")
-if chart_data is not None and not chart_data.empty:
+snapshot_data = load_snapshot_data(selected_coin)
+if snapshot_data is not None and not snapshot_data.empty:
     st.subheader("On-Chain & Market Indicators (from CoinGecko)")
     st.info(
         """
@@ -419,15 +433,15 @@ if chart_data is not None and not chart_data.empty:
     onchain_col1, onchain_col2 = st.columns(2)
     with onchain_col1:
         st.subheader("Transaction Volume (24h)")
-        if 'Transaction_Volume_24h' in chart_data.columns:
-            latest_volume = chart_data['Transaction_Volume_24h'].iloc[-1]
+        if 'Transaction_Volume_24h' in snapshot_data.columns:
+            latest_volume = snapshot_data['Transaction_Volume_24h'].iloc[-1]
             st.metric("Volume (USD)", f"${latest_volume:,.2f}" if pd.notna(latest_volume) else "N/A")
         else:
             st.metric("Volume (USD)", "N/A")
     with onchain_col2:
         st.subheader("Circulating Supply")
-        if 'Circulating_Supply' in chart_data.columns:
-            latest_supply = chart_data['Circulating_Supply'].iloc[-1]
+        if 'Circulating_Supply' in snapshot_data.columns:
+            latest_supply = snapshot_data['Circulating_Supply'].iloc[-1]
             st.metric("Supply", f"{latest_supply:,.0f} {selected_coin.split('-')[0]}" if pd.notna(latest_supply) else "N/A")
         else:
             st.metric("Supply", "N/A")
@@ -442,7 +456,7 @@ if chart_data is not None and not chart_data.empty:
         - **Sentiment:** The percentage of users who voted "Good" on CoinGecko.
         """
     )
-    latest_fundamentals = chart_data.iloc[-1]
+    latest_fundamentals = snapshot_data.iloc[-1]
     fund_col1, fund_col2, fund_col3, fund_col4 = st.columns(4)
 
     # Robust handling of fundamental data
@@ -464,8 +478,13 @@ st.subheader("Full Historical Forecast Data")
 st.dataframe(format_numeric_columns(historical_df))
 
 st.subheader(f"Full Daily Indicator Data for {selected_coin}")
-if chart_data is not None:
-    st.dataframe(format_numeric_columns(chart_data))
+# The full frame is only read when requested; the charts above use a column subset
+if st.checkbox("Load all indicator columns", key=f"full_data_{selected_coin}"):
+    full_chart_data = load_chart_data(selected_coin)
+    if full_chart_data is not None:
+        st.dataframe(format_numeric_columns(full_chart_data))
+    else:
+        st.warning(f"Could not load indicator data for {selected_coin}.")
 
 st.sidebar.markdown("---")
 st.sidebar.info("This is for educational purposes only and is not financial advice.")
\ No newline at end of file
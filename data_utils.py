@@ -1,18 +1,23 @@
 import pandas as pd
-import yfinance as yf
 import requests
 import os
-from ta.momentum import RSIIndicator, StochasticOscillator
-from ta.trend import MACD, SMAIndicator, EMAIndicator, IchimokuIndicator
-from ta.volatility import BollingerBands
-from ta.volume import OnBalanceVolumeIndicator
+import http_client
+from ohlcv_store import get_ohlcv
+from indicators import compute_indicators
 import numpy as np
 from datetime import datetime, timedelta
 import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# --- PROVIDER REQUEST LIMITS ---
+# Per-request timeout (seconds) for each provider API call
+PROVIDER_TIMEOUT = float(os.getenv("PROVIDER_TIMEOUT", http_client.DEFAULT_TIMEOUT))
+# Overall deadline (seconds) for the concurrent provider fan-out in fetch_data
+PROVIDER_DEADLINE = float(os.getenv("PROVIDER_DEADLINE", "20"))
 
 # --- API HELPER FUNCTIONS ---
 
-def fetch_coinglass_data(symbol: str) -> dict:
+def fetch_coinglass_data(symbol: str, timeout: float = PROVIDER_TIMEOUT) -> dict:
     """Fetches advanced futures data from CoinGlass using the definitive, proven endpoint."""
     print(f"   [INFO] Fetching futures data for {symbol} from CoinGlass (Hobbyist Tier)...")
     
@@ -33,7 +38,7 @@ def fetch_coinglass_data(symbol: str) -> dict:
         # Definitive v2 endpoint that provides all data in one call
         url = f"https://open-api.coinglass.com/public/v2/perpetual_market?ex=Binance&symbol={api_symbol}"
         
-        response = requests.get(url, headers=headers)
+        response = http_client.get(url, headers=headers, timeout=timeout)
 
         if response.ok and response.json().get('data'):
             # The response contains data for all exchanges; we need to filter for the specific symbol on Binance
@@ -62,14 +67,14 @@ def fetch_coinglass_data(symbol: str) -> dict:
         print(f"   [ERROR] A critical error occurred while fetching CoinGlass data: {e}")
         return {}
 
-def fetch_cryptoquant_data(symbol: str) -> dict:
+def fetch_cryptoquant_data(symbol: str, timeout: float = PROVIDER_TIMEOUT) -> dict:
     """Placeholder for fetching advanced on-chain data like Exchange Supply Ratio (ESR)."""
     print(f"   [INFO] Fetching advanced on-chain data for {symbol} from CryptoQuant...")
     # To implement: Add CRYPTOQUANT_API_KEY to .env and make the API call here.
     print("   [SUCCESS] CryptoQuant data fetched (placeholder).")
     return {'exchange_supply_ratio': 0.0}
 
-def fetch_santiment_data(slug: str) -> dict:
+def fetch_santiment_data(slug: str, timeout: float = PROVIDER_TIMEOUT) -> dict:
     """Fetches on-chain/social data with robust handling for null values."""
     print(f"   [INFO] Fetching on-chain/social data for {slug} from Santiment...")
     api_key = os.getenv("SANTIMENT_API_KEY")
@@ -85,7 +90,7 @@ def fetch_santiment_data(slug: str) -> dict:
     }}
     """
     try:
-        response = requests.post('https://api.santiment.net/graphql', json={'query': query}, headers={'Authorization': f'Apikey {api_key}'})
+        response = http_client.post('https://api.santiment.net/graphql', json={'query': query}, headers={'Authorization': f'Apikey {api_key}'}, timeout=timeout)
         response.raise_for_status()
         json_data = response.json()
         
@@ -104,7 +109,7 @@ def fetch_santiment_data(slug: str) -> dict:
         print(f"   [WARN] Could not fetch Santiment data: {e}")
         return {}
 
-def fetch_lunarcrush_data(symbol: str) -> dict:
+def fetch_lunarcrush_data(symbol: str, timeout: float = PROVIDER_TIMEOUT) -> dict:
     """Fetches social intelligence for a given symbol directly from the LunarCrush API v4."""
     print(f"   [INFO] Fetching social intelligence for {symbol} from LunarCrush...")
     api_key = os.getenv("LUNARCRUSH_API_KEY")
@@ -117,7 +122,7 @@ def fetch_lunarcrush_data(symbol: str) -> dict:
     headers = {'Authorization': f'Bearer {api_key}'}
     
     try:
-        response = requests.get(url, headers=headers)
+        response = http_client.get(url, headers=headers, timeout=timeout)
         response.raise_for_status()
         data = response.json().get('data', {})
         
@@ -131,14 +136,14 @@ def fetch_lunarcrush_data(symbol: str) -> dict:
         print(f"   [WARN] Could not fetch LunarCrush data: {e}")
         return {}
 
-def fetch_coingecko_data(coin_id: str) -> dict:
+def fetch_coingecko_data(coin_id: str, timeout: float = PROVIDER_TIMEOUT) -> dict:
     """Fetches fundamental and market data from the CoinGecko API."""
     print(f"   [INFO] Fetching CoinGecko data for {coin_id}...")
     api_key = os.getenv("COINGECKO_API_KEY")
     url = f"https://api.coingecko.com/api/v3/coins/{coin_id}"
     params = {'x_cg_demo_api_key': api_key}
     try:
-        response = requests.get(url, params=params)
+        response = http_client.get(url, params=params, timeout=timeout)
         response.raise_for_status()
         data = response.json()
         metrics = {
@@ -156,66 +161,110 @@ def fetch_coingecko_data(coin_id: str) -> dict:
         print(f"   [WARN] Could not fetch CoinGecko data for {coin_id}: {e}")
         return {}
 
-def fetch_data(coin: str) -> pd.DataFrame:
+def fetch_provider_data(coin: str, slug: str, timeouts: dict = None, deadline: float = PROVIDER_DEADLINE) -> dict:
+    """
+    Queries all professional data providers concurrently for a single coin.
+    Each request is bounded by its entry in `timeouts` (default PROVIDER_TIMEOUT),
+    and the whole fan-out by `deadline`; providers that have not answered by the
+    deadline are treated as empty. Returns a dict keyed by provider name.
+    """
+    timeouts = timeouts or {}
+    providers = {
+        'coingecko': (fetch_coingecko_data, slug),
+        'coinglass': (fetch_coinglass_data, coin),
+        'santiment': (fetch_santiment_data, slug),
+        'lunarcrush': (fetch_lunarcrush_data, coin),
+        'cryptoquant': (fetch_cryptoquant_data, coin),
+    }
+    executor = ThreadPoolExecutor(max_workers=len(providers))
+    futures = {name: executor.submit(func, arg, timeout=timeouts.get(name, PROVIDER_TIMEOUT)) for name, (func, arg) in providers.items()}
+    wait(futures.values(), timeout=deadline)
+    # Don't block on stragglers; their own request timeout bounds them.
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    results = {}
+    for name, future in futures.items():
+        if not future.done():
+            print(f"   [WARN] {name} did not respond within the {deadline:.0f}s deadline. Skipping.")
+            results[name] = {}
+            continue
+        try:
+            results[name] = future.result() or {}
+        except Exception as e:
+            print(f"   [WARN] {name} request failed: {e}")
+            results[name] = {}
+    return results
+
+def build_provider_snapshot(provider_data: dict) -> dict:
+    """
+    Flattens the per-provider results of fetch_provider_data into a single
+    point-in-time record using the column names the runner and dashboard expect.
+    """
+    cg_data = provider_data.get('coingecko', {})
+    futures_data = provider_data.get('coinglass', {})
+    santiment_data = provider_data.get('santiment', {})
+    lunar_data = provider_data.get('lunarcrush', {})
+    cryptoquant_data = provider_data.get('cryptoquant', {})
+    return {
+        'Market_Cap_Rank': cg_data.get('market_cap_rank', 0),
+        'All_Time_High_Real': cg_data.get('ath_usd', 0.0),
+        'Transaction_Volume_24h': cg_data.get('total_volume', 0.0),
+        'Circulating_Supply': cg_data.get('circulating_supply', 0.0),
+        'Community_Score': cg_data.get('community_score', 0.0),
+        'Developer_Score': cg_data.get('developer_score', 0.0),
+        'Sentiment_Up_Percentage': cg_data.get('sentiment_up_percentage', 0.0),
+
+        'Funding_Rate': futures_data.get('funding_rate', 0.0),
+        'Open_Interest': futures_data.get('open_interest', 0.0),
+        'Long_Short_Ratio': futures_data.get('long_short_ratio', 0.0),
+        'Futures_Volume_24h': futures_data.get('futures_volume_24h', 0.0),
+
+        'MVRV_Ratio': santiment_data.get('mvrv_usd', 0.0),
+        'Social_Dominance': santiment_data.get('social_dominance', 0.0),
+        'Daily_Active_Addresses': santiment_data.get('daily_active_addresses', 0.0),
+
+        'Galaxy_Score': lunar_data.get('galaxy_score', 0.0),
+        'Alt_Rank': lunar_data.get('alt_rank', 0),
+
+        'Exchange_Supply_Ratio': cryptoquant_data.get('exchange_supply_ratio', 0.0),
+        'Exchange_Net_Flow': 0.0
+    }
+
+def fetch_data(coin: str, price_data: pd.DataFrame = None) -> tuple:
     """
-    Fetches historical data, calculates technical indicators, and enriches
-    it with data from all integrated professional sources.
+    Fetches historical data, calculates technical indicators, and fetches the
+    current snapshot from all integrated professional sources.
+    `price_data` may carry an OHLCV frame whose indicators were already computed
+    for the whole universe (see indicators.compute_indicators_batch); the price
+    download and indicator step are then skipped.
+    Returns:
+        tuple: A (indicator_frame, provider_snapshot) tuple. The snapshot is a
+        single record (see build_provider_snapshot) rather than columns
+        repeated on every row of the frame.
     """
     coingecko_map = {"BTC-USD": "bitcoin", "ETH-USD": "ethereum", "XRP-USD": "ripple"}
     santiment_slug = coingecko_map.get(coin)
 
     print(f"   [INFO] Fetching 180 days of historical data for {coin}...")
     try:
-        df = yf.download(tickers=coin, period="180d", interval="1d", progress=False, auto_adjust=False)
-        if df.empty: return pd.DataFrame()
-        if isinstance(df.columns, pd.MultiIndex): df.columns = df.columns.get_level_values(0)
-
-        print("   [INFO] Calculating technical indicators...")
-        df['SMA'] = SMAIndicator(close=df['Close'], window=20).sma_indicator()
-        df['EMA'] = EMAIndicator(close=df['Close'], window=20).ema_indicator()
-        df['RSI'] = RSIIndicator(close=df['Close']).rsi()
-        macd = MACD(close=df['Close'])
-        df['MACD'] = macd.macd(); df['MACD_Signal'] = macd.macd_signal()
-        bollinger = BollingerBands(close=df['Close'], window=20, window_dev=2)
-        df['BB_High'] = bollinger.bollinger_hband(); df['BB_Low'] = bollinger.bollinger_lband()
-        stoch = StochasticOscillator(high=df['High'], low=df['Low'], close=df['Close'])
-        df['Stoch_k'] = stoch.stoch(); df['Stoch_d'] = stoch.stoch_signal()
-        df['OBV'] = OnBalanceVolumeIndicator(close=df['Close'], volume=df['Volume']).on_balance_volume()
-        ichimoku = IchimokuIndicator(high=df['High'], low=df['Low'])
-        df['Ichimoku_a'] = ichimoku.ichimoku_a(); df['Ichimoku_b'] = ichimoku.ichimoku_b()
-
-        cg_data = fetch_coingecko_data(santiment_slug)
-        futures_data = fetch_coinglass_data(coin)
-        santiment_data = fetch_santiment_data(santiment_slug)
-        lunar_data = fetch_lunarcrush_data(coin)
-        cryptoquant_data = fetch_cryptoquant_data(coin)
-        
-        df['Market_Cap_Rank'] = cg_data.get('market_cap_rank', 0)
-        df['All_Time_High_Real'] = cg_data.get('ath_usd', 0.0)
-        df['Transaction_Volume_24h'] = cg_data.get('total_volume', 0.0)
-        df['Circulating_Supply'] = cg_data.get('circulating_supply', 0.0)
-        df['Community_Score'] = cg_data.get('community_score', 0.0)
-        df['Developer_Score'] = cg_data.get('developer_score', 0.0)
-        df['Sentiment_Up_Percentage'] = cg_data.get('sentiment_up_percentage', 0.0)
-        
-        df['Funding_Rate'] = futures_data.get('funding_rate', 0.0)
-        df['Open_Interest'] = futures_data.get('open_interest', 0.0)
-        df['Long_Short_Ratio'] = futures_data.get('long_short_ratio', 0.0)
-        df['Futures_Volume_24h'] = futures_data.get('futures_volume_24h', 0.0)
-        
-        df['MVRV_Ratio'] = santiment_data.get('mvrv_usd', 0.0)
-        df['Social_Dominance'] = santiment_data.get('social_dominance', 0.0)
-        df['Daily_Active_Addresses'] = santiment_data.get('daily_active_addresses', 0.0)
-        
-        df['Galaxy_Score'] = lunar_data.get('galaxy_score', 0.0)
-        df['Alt_Rank'] = lunar_data.get('alt_rank', 0)
-        
-        df['Exchange_Supply_Ratio'] = cryptoquant_data.get('exchange_supply_ratio', 0.0)
-        df['Exchange_Net_Flow'] = 0.0
+        # Start the provider fan-out in the background so it overlaps the price download
+        provider_executor = ThreadPoolExecutor(max_workers=1)
+        provider_future = provider_executor.submit(fetch_provider_data, coin, santiment_slug)
+        provider_executor.shutdown(wait=False)
+
+        if price_data is not None:
+            df = price_data.copy()
+        else:
+            df = get_ohlcv(coin, days=180)
+            print("   [INFO] Calculating technical indicators...")
+            df = compute_indicators(df)
+        if df.empty: return pd.DataFrame(), {}
+
+        snapshot = build_provider_snapshot(provider_future.result())
 
         df.dropna(inplace=True)
         print(f"   [SUCCESS] Data processing complete for {coin}.")
-        return df
+        return df, snapshot
     except Exception as e:
         print(f"   [ERROR] An error occurred in fetch_data for {coin}: {e}")
-        return pd.DataFrame()
\ No newline at end of file
+        return pd.DataFrame(), {}
\ No newline at end of file
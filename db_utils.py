@@ -38,6 +38,10 @@ else:
 if engine is None:
     raise Exception("Database engine could not be initialized.")
 
+# Bulk-load records with PostgreSQL COPY when the engine uses the psycopg (v3) driver;
+# other backends and drivers use DataFrame.to_sql
+DB_BULK_COPY = os.getenv("DB_BULK_COPY", "1") == "1"
+
 metadata = MetaData()
 
 # --- Unified Table Schema Definition ---
@@ -119,13 +123,37 @@ def init_db():
         logger.error(f" ❌  [ERROR] Could not initialize database: {e}")
         raise
 
+def copy_supported() -> bool:
+    """True when the engine can bulk-load through psycopg's COPY support."""
+    return DB_BULK_COPY and engine.dialect.name == "postgresql" and engine.dialect.driver == "psycopg"
+
+def copy_frame(frame: pd.DataFrame, table_name: str = 'forecasts'):
+    """
+    Appends `frame` to `table_name` with a single COPY ... FROM STDIN, streaming the rows
+    instead of issuing an INSERT per row. NaN/NaT are written as NULL, like to_sql.
+    """
+    from psycopg import sql
+    statement = sql.SQL("COPY {} ({}) FROM STDIN").format(
+        sql.Identifier(table_name), sql.SQL(", ").join(map(sql.Identifier, frame.columns))
+    )
+    # Object dtype hands psycopg plain Python values; missing values become None
+    values = frame.astype(object).where(frame.notna(), None)
+    with engine.begin() as connection:
+        driver_connection = connection.connection.driver_connection
+        with driver_connection.cursor() as cursor, cursor.copy(statement) as copy:
+            for row in values.itertuples(index=False, name=None):
+                copy.write_row(row)
+
 def save_forecast_results(results_df: pd.DataFrame):
     logger.info("   [INFO] Saving forecast results to the database...")
     try:
-        # Ensure the Date column is properly typed before insertion
-        results_df['Date'] = pd.to_datetime(results_df['Date'])
-        results_df.to_sql('forecasts', engine, if_exists='append', index=False)
-        logger.info(f"   [SUCCESS] Saved {len(results_df)} new records to the database.")
+        # Ensure the Date column is properly typed before insertion, without modifying the caller's frame
+        frame = results_df.assign(Date=pd.to_datetime(results_df['Date']))
+        if copy_supported():
+            copy_frame(frame, 'forecasts')
+        else:
+            frame.to_sql('forecasts', engine, if_exists='append', index=False)
+        logger.info(f"   [SUCCESS] Saved {len(frame)} new records to the database.")
     except Exception as e:
         logger.error(f" ❌  [ERROR] Could not save results to database: {e}")
         raise
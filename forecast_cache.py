@@ -0,0 +1,86 @@
+import os
+import json
+import pickle
+import hashlib
+import numpy as np
+
+# --- Content-Addressed Forecast Cache ---
+# Forecast outputs are stored on disk under a hash of the exact input series
+# and the model configuration, so re-running the pipeline on unchanged data
+# (e.g. a retry after an LLM failure) returns the earlier forecasts instantly.
+# The directory is size-bounded: the least recently used entries are evicted.
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(SCRIPT_DIR, 'data', 'cache', 'forecasts')
+FORECAST_CACHE_ENABLED = os.getenv("FORECAST_CACHE", "1") == "1"
+FORECAST_CACHE_MAX_BYTES = int(os.getenv("FORECAST_CACHE_MAX_MB", "64")) * 1024 * 1024
+# Bump when a model's code changes in a way that should invalidate stored outputs
+CACHE_VERSION = 1
+
+def fingerprint(config: dict, *series) -> str:
+    """
+    Hashes a model configuration together with its input series (arrays, Series or
+    DatetimeIndex). Any change to a value, a timestamp or the config gives a new key.
+    """
+    digest = hashlib.sha256(json.dumps({'version': CACHE_VERSION, **config}, sort_keys=True, default=str).encode())
+    for values in series:
+        array = np.ascontiguousarray(np.asarray(values))
+        if array.dtype == object:
+            array = array.astype(str)
+        digest.update(f"{array.dtype}{array.shape}".encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+def _path(key: str) -> str:
+    return os.path.join(CACHE_DIR, f"{key}.pkl")
+
+def get(key: str, default=None):
+    """Returns the cached value for `key`, or `default` on a miss."""
+    if not FORECAST_CACHE_ENABLED:
+        return default
+    path = _path(key)
+    try:
+        with open(path, 'rb') as f:
+            value = pickle.load(f)
+    except FileNotFoundError:
+        return default
+    except Exception as e:
+        print(f"   [WARN] Discarding unreadable forecast cache entry {key[:12]}: {e}")
+        return default
+    # Mark as recently used for eviction
+    os.utime(path)
+    return value
+
+def put(key: str, value):
+    """Stores `value` under `key` and evicts the least recently used entries over the size limit."""
+    if not FORECAST_CACHE_ENABLED:
+        return
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f"{_path(key)}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(value, f)
+        os.replace(tmp_path, _path(key))
+        _evict()
+    except Exception as e:
+        print(f"   [WARN] Could not write forecast cache entry {key[:12]}: {e}")
+
+def _evict():
+    entries = []
+    for name in os.listdir(CACHE_DIR):
+        if not name.endswith(".pkl"):
+            continue
+        try:
+            stat = os.stat(os.path.join(CACHE_DIR, name))
+        except FileNotFoundError:
+            # Removed by a concurrent worker
+            continue
+        entries.append((stat.st_mtime, stat.st_size, name))
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total <= FORECAST_CACHE_MAX_BYTES:
+            break
+        try:
+            os.remove(os.path.join(CACHE_DIR, name))
+        except FileNotFoundError:
+            pass
+        total -= size
@@ -1,21 +1,122 @@
+import os
+import json
+import joblib
 import pandas as pd
 import numpy as np
-from prophet import Prophet
-from sklearn.preprocessing import MinMaxScaler
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import Dense, LSTM
-from tensorflow.keras.optimizers import Adam
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from window_dataset import build_windows, build_multi_asset_windows
+import lstm_numpy
+import forecast_cache
+
+# Prophet (cmdstan), TensorFlow and scikit-learn take several seconds to import,
+# so they are imported inside the functions that need them. Importing this
+# module stays cheap for runs that never produce a forecast.
+
+# --- LSTM Model Store ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+LSTM_MODEL_DIR = os.path.join(SCRIPT_DIR, 'data', 'models', 'lstm')
+# Retrain from scratch at least this often, even without detected drift
+LSTM_FULL_RETRAIN_DAYS = int(os.getenv("LSTM_FULL_RETRAIN_DAYS", "7"))
+LSTM_FINE_TUNE_EPOCHS = int(os.getenv("LSTM_FINE_TUNE_EPOCHS", "3"))
+# Drift checks: loss on the most recent windows vs. the loss at training time,
+# and how far (in scaled units) prices may leave the fitted [0, 1] scaler range
+LSTM_DRIFT_WINDOWS = 10
+LSTM_DRIFT_FACTOR = float(os.getenv("LSTM_DRIFT_FACTOR", "3.0"))
+LSTM_SCALE_DRIFT = 0.1
+# Shared multi-asset LSTM: one network over every ticker's windows
+LSTM_MULTI_BATCH_SIZE = int(os.getenv("LSTM_MULTI_BATCH_SIZE", "256"))
+# Large batches mean fewer gradient steps per epoch than the per-coin model's batch_size=16
+LSTM_MULTI_EPOCHS = int(os.getenv("LSTM_MULTI_EPOCHS", "10"))
+LSTM_ASSET_EMBEDDING_DIM = 4
+
+# --- Prophet Warm-Start Store ---
+PROPHET_MODEL_DIR = os.path.join(SCRIPT_DIR, 'data', 'models', 'prophet')
+PROPHET_WARM_START_PARAMS = ('k', 'm', 'delta', 'beta', 'sigma_obs')
+# Fit from Stan's default initialization at least this often
+PROPHET_FULL_REFIT_DAYS = int(os.getenv("PROPHET_FULL_REFIT_DAYS", "7"))
+
+def _prophet_params_path(key: str) -> str:
+    return os.path.join(PROPHET_MODEL_DIR, f"{key}.json")
+
+def _load_prophet_params(key: str):
+    path = _prophet_params_path(key)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"   [WARN] Could not read stored Prophet parameters for {key}: {e}")
+        return None
+
+def _save_prophet_params(key: str, model, iterations: int, cold_start: bool, previous: dict):
+    stored = {name: model.params[name][0].tolist() for name in PROPHET_WARM_START_PARAMS}
+    stored['iterations'] = iterations
+    # Remember the cost and date of the last cold fit to report savings and schedule refits
+    stored['cold_iterations'] = iterations if cold_start else previous.get('cold_iterations')
+    stored['last_full_fit'] = datetime.now().isoformat() if cold_start else previous.get('last_full_fit')
+    os.makedirs(PROPHET_MODEL_DIR, exist_ok=True)
+    with open(_prophet_params_path(key), 'w') as f:
+        json.dump(stored, f)
+
+def _warm_start_init(model, df: pd.DataFrame, stored: dict):
+    """Returns Stan inits from stored parameters, or None if they no longer fit this model's shape."""
+    if stored is None:
+        return None
+    last_full = stored.get('last_full_fit')
+    if not last_full or datetime.now() - datetime.fromisoformat(last_full) >= timedelta(days=PROPHET_FULL_REFIT_DAYS):
+        return None
+    # Same changepoint count Prophet will derive for this history
+    history_size = int(np.floor(len(df) * model.changepoint_range))
+    n_changepoints = max(min(model.n_changepoints, history_size - 1), 1)
+    if len(stored['delta']) != n_changepoints:
+        return None
+    init = {name: np.array(stored[name]) for name in ('delta', 'beta')}
+    init.update({name: float(stored[name][0]) for name in ('k', 'm', 'sigma_obs')})
+    return init
+
+def _fit_prophet(ds, y, periods: int, warm_start_key: str = None) -> pd.DataFrame:
+    """
+    Fits a Prophet model on (ds, y) and returns the forecast for the next `periods` days.
+    With a `warm_start_key` the MAP optimization starts from the parameters fitted on
+    the previous run (persisted under that key) instead of Stan's default initialization,
+    falling back to a full cold fit on schedule, on a shape change, or if the warm fit fails.
+    """
+    from prophet import Prophet
+    df = pd.DataFrame({'ds': ds, 'y': y})
+    if not warm_start_key:
+        model = Prophet(daily_seasonality=True)
+        model.fit(df)
+    else:
+        stored = _load_prophet_params(warm_start_key)
+        model = Prophet(daily_seasonality=True)
+        init = _warm_start_init(model, df, stored)
+        try:
+            if init is None:
+                raise ValueError("no usable warm-start parameters")
+            model.fit(df, init=init, save_iterations=True)
+            cold_start = False
+        except Exception as e:
+            print(f"   [INFO] Prophet full refit for {warm_start_key} ({e}).")
+            model = Prophet(daily_seasonality=True)
+            model.fit(df, save_iterations=True)
+            cold_start = True
+        iterations = len(model.stan_backend.stan_fit.optimized_iterations_np)
+        cold_iterations = (stored or {}).get('cold_iterations')
+        if not cold_start and cold_iterations:
+            print(f"   [INFO] Prophet warm start for {warm_start_key}: {iterations} iterations "
+                  f"vs {cold_iterations} on the last full fit ({cold_iterations - iterations} fewer).")
+        _save_prophet_params(warm_start_key, model, iterations, cold_start, stored or {})
+    future = model.make_future_dataframe(periods=periods)
+    forecast = model.predict(future)
+    return forecast.iloc[-periods:][['ds', 'yhat']]
 
 def prophet_forecast(df: pd.DataFrame) -> float:
     if df.empty: return np.nan
     print("   [INFO] Starting Prophet 'Close' price forecast...")
     try:
-        prophet_df = pd.DataFrame({'ds': df.index, 'y': df['Close'].values})
-        model = Prophet(daily_seasonality=True)
-        model.fit(prophet_df)
-        future = model.make_future_dataframe(periods=1)
-        forecast = model.predict(future)
-        predicted_price = forecast.iloc[-1]['yhat']
+        predicted_price = _fit_prophet(df.index, df['Close'].values, periods=1).iloc[-1]['yhat']
         print(f"   [SUCCESS] Prophet 'Close' forecast complete. Predicted: {predicted_price:.2f}")
         return float(predicted_price)
     except Exception as e:
@@ -26,46 +127,249 @@ def prophet_forecast_highs(df: pd.DataFrame, periods: int = 5) -> list:
     if df.empty: return []
     print(f"   [INFO] Starting Prophet {periods}-day 'High' price forecast...")
     try:
-        prophet_df = pd.DataFrame({'ds': df.index, 'y': df['High'].values})
-        model = Prophet(daily_seasonality=True)
-        model.fit(prophet_df)
-        future = model.make_future_dataframe(periods=periods)
-        forecast = model.predict(future)
-        future_forecasts = forecast.iloc[-periods:]
-        predicted_highs = future_forecasts[['ds', 'yhat']].to_dict('records')
+        predicted_highs = _fit_prophet(df.index, df['High'].values, periods=periods).to_dict('records')
         print(f"   [SUCCESS] Prophet {periods}-day 'High' forecast complete.")
         return predicted_highs
     except Exception as e:
         print(f"   [ERROR] Prophet 'High' forecasting error: {e}")
         return []
 
-def lstm_forecast(df: pd.DataFrame, look_back_period: int = 60) -> float:
+def _prophet_target_job(target: str, ds, y, periods: int, ticker: str = None) -> list:
+    cache_key = forecast_cache.fingerprint({'model': 'prophet', 'target': target, 'periods': periods}, ds, y)
+    records = forecast_cache.get(cache_key)
+    if records is not None:
+        print(f"   [INFO] Prophet {periods}-day '{target}' forecast reused from cache (inputs unchanged).")
+        return records
+    print(f"   [INFO] Starting Prophet {periods}-day '{target}' forecast...")
+    try:
+        warm_start_key = f"{ticker}_{target}" if ticker else None
+        records = _fit_prophet(ds, y, periods, warm_start_key=warm_start_key).to_dict('records')
+        forecast_cache.put(cache_key, records)
+        print(f"   [SUCCESS] Prophet '{target}' forecast complete.")
+        return records
+    except Exception as e:
+        print(f"   [ERROR] Prophet '{target}' forecasting error: {e}")
+        return []
+
+def prophet_forecast_targets(df: pd.DataFrame, targets: dict, ticker: str = None) -> dict:
+    """
+    Fits one Prophet model per target column concurrently and returns all forecasts in one call.
+    `targets` maps column name to horizon in days, e.g. {'Close': 1, 'High': 5}.
+    Returns {column: [{'ds': ..., 'yhat': ...}, ...]} with an empty list for a failed target.
+    Each fit's Stan optimization runs in its own cmdstan process, so a thread per
+    target is enough to run them in parallel; only the target columns are read from `df`.
+    With a `ticker`, each target is warm-started from its previous run's parameters.
+    """
+    if df.empty: return {target: [] for target in targets}
+    ds = df.index
+    with ThreadPoolExecutor(max_workers=len(targets)) as executor:
+        futures = {
+            target: executor.submit(_prophet_target_job, target, ds, df[target].values, periods, ticker)
+            for target, periods in targets.items()
+        }
+        return {target: future.result() for target, future in futures.items()}
+
+def _build_lstm_model(look_back_period: int):
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import Dense, LSTM
+    from tensorflow.keras.optimizers import Adam
+    model = Sequential([
+        LSTM(50, return_sequences=True, input_shape=(look_back_period, 1)),
+        LSTM(50, return_sequences=False),
+        Dense(25),
+        Dense(1)
+    ])
+    model.compile(optimizer=Adam(), loss='mean_squared_error')
+    return model
+
+def _lstm_store_paths(ticker: str) -> dict:
+    base = os.path.join(LSTM_MODEL_DIR, ticker)
+    return {
+        'model': base + ".keras", 'scaler': base + "_scaler.joblib", 'meta': base + "_meta.json",
+        'weights': base + "_weights.npz"
+    }
+
+def _load_lstm_model(ticker: str):
+    from tensorflow.keras.models import load_model
+    return load_model(_lstm_store_paths(ticker)['model'])
+
+def _load_lstm(ticker: str, look_back_period: int):
+    """
+    Loads the stored inference weights, scaler and metadata for a ticker, or (None, None, None).
+    Only the exported NumPy weights are read, so TensorFlow isn't imported unless the
+    store predates weight export, in which case they are exported from the Keras model once.
+    """
+    paths = _lstm_store_paths(ticker)
+    if not all(os.path.exists(paths[p]) for p in ('model', 'scaler', 'meta')):
+        return None, None, None
+    try:
+        with open(paths['meta']) as f:
+            meta = json.load(f)
+        if meta.get('look_back_period') != look_back_period:
+            return None, None, None
+        if not os.path.exists(paths['weights']):
+            np.savez(paths['weights'], **lstm_numpy.export_weights(_load_lstm_model(ticker)))
+        with np.load(paths['weights']) as stored:
+            weights = dict(stored)
+        return weights, joblib.load(paths['scaler']), meta
+    except Exception as e:
+        print(f"   [WARN] Could not load stored LSTM model for {ticker}, retraining: {e}")
+        return None, None, None
+
+def _save_lstm(ticker: str, model, scaler, meta: dict, weights: dict):
+    os.makedirs(LSTM_MODEL_DIR, exist_ok=True)
+    paths = _lstm_store_paths(ticker)
+    model.save(paths['model'])
+    np.savez(paths['weights'], **weights)
+    joblib.dump(scaler, paths['scaler'])
+    with open(paths['meta'], 'w') as f:
+        json.dump(meta, f)
+
+def _needs_full_retrain(weights: dict, scaler, meta: dict, df: pd.DataFrame, look_back_period: int) -> str:
+    """Returns the reason a stored model must be retrained from scratch, or '' if it can be fine-tuned."""
+    if weights is None:
+        return "no stored model"
+    last_full = datetime.fromisoformat(meta['last_full_train'])
+    if datetime.now() - last_full >= timedelta(days=LSTM_FULL_RETRAIN_DAYS):
+        return f"scheduled full retrain (last one {last_full.date()})"
+    scaled = scaler.transform(df[['Close']])
+    # Prices far outside the range the scaler was fitted on mean the model's inputs have drifted
+    if scaled.min() < -LSTM_SCALE_DRIFT or scaled.max() > 1 + LSTM_SCALE_DRIFT:
+        return "prices moved outside the fitted scaler range"
+    X_recent, y_recent = build_windows(scaled, look_back_period, start=len(scaled) - LSTM_DRIFT_WINDOWS)
+    if len(X_recent):
+        # Mean squared error, as model.evaluate() would report it
+        recent_loss = float(np.mean((lstm_numpy.predict(weights, X_recent)[:, 0] - y_recent) ** 2))
+        if recent_loss > LSTM_DRIFT_FACTOR * max(meta.get('train_loss', 0.0), 1e-6):
+            return f"loss drifted ({recent_loss:.5f} vs {meta['train_loss']:.5f} at training)"
+    return ""
+
+def lstm_forecast(df: pd.DataFrame, look_back_period: int = 60, ticker: str = None) -> float:
+    """
+    Trains an LSTM on the 'Close' series and predicts the next close.
+    With a `ticker` the fitted model and scaler are persisted between runs: later
+    calls fine-tune the stored model on newly arrived windows only, and fall back
+    to a full retrain on schedule (LSTM_FULL_RETRAIN_DAYS) or when drift is detected.
+    Predictions run through the NumPy forward pass in lstm_numpy, so a call with
+    nothing new to train on doesn't import TensorFlow.
+    """
     if df.empty or len(df) <= look_back_period: return np.nan
+    # Only forecasts backed by the model store are cached; without a ticker every call trains afresh
+    cache_key = forecast_cache.fingerprint(
+        {'model': 'lstm', 'ticker': ticker, 'look_back_period': look_back_period}, df.index, df['Close'].values
+    ) if ticker else None
+    cached = forecast_cache.get(cache_key) if ticker else None
+    if cached is not None:
+        print(f"   [INFO] LSTM 'Close' forecast reused from cache (inputs unchanged): {cached:,.2f}")
+        return cached
     print("   [INFO] Starting LSTM 'Close' price forecast...")
     try:
         data = df[['Close']].copy()
-        scaler = MinMaxScaler(feature_range=(0, 1))
-        scaled_data = scaler.fit_transform(data)
-        X_train, y_train = [], []
-        for i in range(look_back_period, len(scaled_data)):
-            X_train.append(scaled_data[i-look_back_period:i, 0])
-            y_train.append(scaled_data[i, 0])
-        X_train, y_train = np.array(X_train), np.array(y_train)
-        X_train = np.reshape(X_train, (X_train.shape[0], X_train.shape[1], 1))
-        model = Sequential([
-            LSTM(50, return_sequences=True, input_shape=(X_train.shape[1], 1)),
-            LSTM(50, return_sequences=False),
-            Dense(25),
-            Dense(1)
-        ])
-        model.compile(optimizer=Adam(), loss='mean_squared_error')
-        model.fit(X_train, y_train, batch_size=16, epochs=5, verbose=0)
+        last_date = pd.Timestamp(df.index[-1]).isoformat()
+        weights, scaler, meta = _load_lstm(ticker, look_back_period) if ticker else (None, None, None)
+        retrain_reason = _needs_full_retrain(weights, scaler, meta, df, look_back_period) if ticker else "no model store"
+        model = None
+
+        if retrain_reason:
+            print(f"   [INFO] Full LSTM training ({retrain_reason})...")
+            from sklearn.preprocessing import MinMaxScaler
+            scaler = MinMaxScaler(feature_range=(0, 1))
+            scaled_data = scaler.fit_transform(data)
+            X_train, y_train = build_windows(scaled_data, look_back_period)
+            model = _build_lstm_model(look_back_period)
+            history = model.fit(X_train, y_train, batch_size=16, epochs=5, verbose=0)
+            meta = {
+                'look_back_period': look_back_period, 'last_full_train': datetime.now().isoformat(),
+                'last_date': last_date, 'train_loss': float(history.history['loss'][-1])
+            }
+        else:
+            scaled_data = scaler.transform(data)
+            # Only windows whose target bar arrived after the last training run
+            new_rows = int((df.index > pd.Timestamp(meta['last_date'])).sum())
+            X_new, y_new = build_windows(scaled_data, look_back_period, start=len(scaled_data) - new_rows)
+            if len(X_new):
+                print(f"   [INFO] Fine-tuning stored LSTM on {len(X_new)} new window(s)...")
+                model = _load_lstm_model(ticker)
+                model.fit(X_new, y_new, batch_size=16, epochs=LSTM_FINE_TUNE_EPOCHS, verbose=0)
+            else:
+                print("   [INFO] No new bars since the last training run; reusing stored LSTM.")
+            meta['last_date'] = max(meta['last_date'], last_date)
+
+        if model is not None:
+            weights = lstm_numpy.export_weights(model)
+            if ticker:
+                _save_lstm(ticker, model, scaler, meta, weights)
+
         last_sequence = scaled_data[-look_back_period:]
         last_sequence = np.reshape(last_sequence, (1, look_back_period, 1))
-        predicted_price_scaled = model.predict(last_sequence, verbose=0)
+        predicted_price_scaled = lstm_numpy.predict(weights, last_sequence)
         predicted_price = scaler.inverse_transform(predicted_price_scaled)
         print(f"   [SUCCESS] LSTM 'Close' forecast complete. Predicted: {predicted_price[0][0]:,.2f}")
+        if ticker:
+            forecast_cache.put(cache_key, float(predicted_price[0][0]))
         return float(predicted_price[0][0])
     except Exception as e:
         print(f"   [ERROR] LSTM forecasting error: {e}")
-        return np.nan
\ No newline at end of file
+        return np.nan
+
+def _build_multi_asset_lstm_model(look_back_period: int, n_assets: int):
+    """Same stack as _build_lstm_model, with a learned per-asset embedding joined before the dense head."""
+    from tensorflow.keras.models import Model
+    from tensorflow.keras.layers import Input, Dense, LSTM, Embedding, Flatten, Concatenate
+    from tensorflow.keras.optimizers import Adam
+    sequence = Input(shape=(look_back_period, 1))
+    asset = Input(shape=(1,), dtype='int32')
+    x = LSTM(50, return_sequences=True)(sequence)
+    x = LSTM(50, return_sequences=False)(x)
+    embedding = Flatten()(Embedding(n_assets, LSTM_ASSET_EMBEDDING_DIM)(asset))
+    x = Dense(25)(Concatenate()([x, embedding]))
+    model = Model(inputs=[sequence, asset], outputs=Dense(1)(x))
+    model.compile(optimizer=Adam(), loss='mean_squared_error')
+    return model
+
+def lstm_forecast_multi(frames: dict, look_back_period: int = 60, epochs: int = None) -> dict:
+    """
+    Trains one shared LSTM over the 'Close' windows of every ticker in `frames`
+    ({ticker: DataFrame}) and predicts each ticker's next close in a single batched call.
+    Each series is min-max scaled on its own, so the network sees comparable inputs
+    across assets, and an asset embedding lets it keep per-asset behaviour.
+    Returns {ticker: predicted close}, with NaN for tickers too short to forecast.
+    """
+    forecasts = {ticker: np.nan for ticker in frames}
+    # Any failure leaves the tickers at NaN, so the caller falls back to per-coin LSTMs
+    try:
+        usable = {ticker: df for ticker, df in frames.items() if df is not None and len(df) > look_back_period}
+        epochs = epochs or LSTM_MULTI_EPOCHS
+        cache_key = forecast_cache.fingerprint(
+            {'model': 'lstm_multi', 'tickers': sorted(usable), 'look_back_period': look_back_period,
+             'epochs': epochs, 'batch_size': LSTM_MULTI_BATCH_SIZE},
+            *[part for ticker in sorted(usable) for part in (usable[ticker].index, usable[ticker]['Close'].values)]
+        )
+        cached = forecast_cache.get(cache_key)
+        if cached is not None:
+            print("   [INFO] Shared LSTM forecasts reused from cache (inputs unchanged).")
+            return {ticker: cached.get(ticker, np.nan) for ticker in frames}
+
+        from sklearn.preprocessing import MinMaxScaler
+        scalers, scaled = {}, {}
+        for ticker, df in usable.items():
+            scalers[ticker] = MinMaxScaler(feature_range=(0, 1))
+            scaled[ticker] = scalers[ticker].fit_transform(df[['Close']])
+        if not scaled:
+            return forecasts
+        print(f"   [INFO] Training shared LSTM over {len(scaled)} tickers...")
+        X_train, y_train, asset_ids, assets = build_multi_asset_windows(scaled, look_back_period)
+        model = _build_multi_asset_lstm_model(look_back_period, len(assets))
+        model.fit([X_train, asset_ids], y_train, batch_size=LSTM_MULTI_BATCH_SIZE,
+                  epochs=epochs, shuffle=True, verbose=0)
+
+        last_sequences = np.stack([scaled[ticker][-look_back_period:] for ticker in assets])
+        predicted_scaled = model.predict([last_sequences, np.arange(len(assets))], verbose=0)
+        for i, ticker in enumerate(assets):
+            forecasts[ticker] = float(scalers[ticker].inverse_transform(predicted_scaled[i:i + 1])[0][0])
+        forecast_cache.put(cache_key, {ticker: forecasts[ticker] for ticker in assets})
+        print(f"   [SUCCESS] Shared LSTM forecast complete for {len(assets)} tickers "
+              f"({len(X_train)} training windows).")
+    except Exception as e:
+        print(f"   [ERROR] Shared LSTM forecasting error: {e}")
+    return forecasts
@@ -0,0 +1,110 @@
+import os
+import json
+import pandas as pd
+import pyarrow.parquet as pq
+
+# --- Per-Coin Indicator Frame Storage ---
+# The runner writes each coin's detailed indicator frame as compressed Parquet
+# and the dashboard reads it back, optionally projecting only the columns a
+# chart needs. Legacy CSV files are still readable until the next run rewrites them.
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(SCRIPT_DIR, 'data')
+COMPRESSION = 'zstd'
+
+def _parquet_path(ticker: str) -> str:
+    return os.path.join(DATA_DIR, f"{ticker}_data.parquet")
+
+def _csv_path(ticker: str) -> str:
+    return os.path.join(DATA_DIR, f"{ticker}_data.csv")
+
+def save_market_data(ticker: str, df: pd.DataFrame) -> str:
+    """Writes a coin's indicator frame as typed, compressed Parquet and returns the file path."""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    frame = df.copy()
+    frame.index = pd.to_datetime(frame.index)
+    frame.index.name = 'Date'
+    # Keep numeric columns as proper numbers rather than whatever object dtype they arrived as
+    for column in frame.columns:
+        if frame[column].dtype == object:
+            converted = pd.to_numeric(frame[column], errors='coerce')
+            if converted.notna().sum() == frame[column].notna().sum():
+                frame[column] = converted
+    path = _parquet_path(ticker)
+    tmp_path = path + ".tmp"
+    frame.to_parquet(tmp_path, compression=COMPRESSION)
+    os.replace(tmp_path, path)
+    return path
+
+def load_market_data(ticker: str, columns: list = None) -> pd.DataFrame:
+    """
+    Loads a coin's indicator frame, reading only `columns` when given.
+    Columns missing from the file are ignored. Returns None if nothing is stored.
+    """
+    parquet_path, csv_path = _parquet_path(ticker), _csv_path(ticker)
+    if os.path.exists(parquet_path):
+        if columns is not None:
+            available = set(pq.read_schema(parquet_path).names)
+            columns = [c for c in columns if c in available]
+        return pd.read_parquet(parquet_path, columns=columns)
+    if os.path.exists(csv_path):
+        usecols = None if columns is None else (lambda c: c in columns or c == 'Date' or c.startswith('Unnamed'))
+        return pd.read_csv(csv_path, index_col=0, parse_dates=True, usecols=usecols)
+    return None
+
+
+def _snapshot_path(ticker: str) -> str:
+    return os.path.join(DATA_DIR, f"{ticker}_snapshots.parquet")
+
+def save_snapshot(ticker: str, snapshot: dict, run_time) -> str:
+    """
+    Appends a run's provider snapshot to the coin's per-date snapshot history.
+    A snapshot for the same date replaces the earlier one.
+    """
+    os.makedirs(DATA_DIR, exist_ok=True)
+    record = pd.DataFrame([snapshot], index=pd.DatetimeIndex([pd.Timestamp(run_time).normalize()], name='Date'))
+    record = record.apply(pd.to_numeric, errors='coerce')
+    path = _snapshot_path(ticker)
+    if os.path.exists(path):
+        history = pd.concat([pd.read_parquet(path), record])
+        record = history[~history.index.duplicated(keep='last')].sort_index()
+    tmp_path = path + ".tmp"
+    record.to_parquet(tmp_path, compression=COMPRESSION)
+    os.replace(tmp_path, path)
+    return path
+
+def load_snapshots(ticker: str, columns: list = None) -> pd.DataFrame:
+    """Loads a coin's provider snapshot history (one row per date), or None if nothing is stored."""
+    path = _snapshot_path(ticker)
+    if not os.path.exists(path):
+        return None
+    if columns is not None:
+        available = set(pq.read_schema(path).names)
+        columns = [c for c in columns if c in available]
+    return pd.read_parquet(path, columns=columns)
+
+
+def _forecast_path(ticker: str) -> str:
+    return os.path.join(DATA_DIR, f"{ticker}_forecast.json")
+
+def save_forecast(ticker: str, forecast: dict, run_time) -> str:
+    """
+    Stores the forecast stage's output for a coin (JSON-serializable values) with the
+    run time, so a later llm-only run can use it. Replaces the previous forecast.
+    """
+    os.makedirs(DATA_DIR, exist_ok=True)
+    path = _forecast_path(ticker)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({'run_time': pd.Timestamp(run_time).isoformat(), **forecast}, f)
+    os.replace(tmp_path, path)
+    return path
+
+def load_forecast(ticker: str) -> dict:
+    """Loads the coin's last stored forecast (with its 'run_time' as a Timestamp), or None if nothing is stored."""
+    path = _forecast_path(ticker)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        forecast = json.load(f)
+    forecast['run_time'] = pd.Timestamp(forecast['run_time'])
+    return forecast
@@ -0,0 +1,73 @@
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# --- HTTP CLIENT CONFIGURATION ---
+# Default timeout (seconds) applied to every request that doesn't set its own
+DEFAULT_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))
+# Maximum number of keep-alive connections held open per host
+MAX_CONNECTIONS_PER_HOST = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "10"))
+# Retries for connection errors and 429/5xx responses, with exponential backoff
+MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+BACKOFF_FACTOR = float(os.getenv("HTTP_BACKOFF_FACTOR", "0.5"))
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_session = None
+_session_lock = threading.Lock()
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that applies a default timeout when the caller doesn't pass one."""
+
+    def __init__(self, *args, timeout: float = DEFAULT_TIMEOUT, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+def create_session(timeout: float = DEFAULT_TIMEOUT, max_connections_per_host: int = MAX_CONNECTIONS_PER_HOST,
+                   max_retries: int = MAX_RETRIES, backoff_factor: float = BACKOFF_FACTOR) -> requests.Session:
+    """
+    Builds a requests Session with keep-alive connection pooling, a bounded
+    number of connections per host, retry with backoff and a default timeout.
+    """
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        # The provider POSTs (Santiment GraphQL) are read-only queries, so retrying them is safe
+        allowed_methods=frozenset(["GET", "POST"]),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = TimeoutHTTPAdapter(
+        timeout=timeout,
+        max_retries=retry,
+        pool_maxsize=max_connections_per_host,
+        pool_block=True
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def get_session() -> requests.Session:
+    """Returns the process-wide shared session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+def get(url: str, **kwargs) -> requests.Response:
+    """Sends a GET request through the shared pooled session."""
+    return get_session().get(url, **kwargs)
+
+def post(url: str, **kwargs) -> requests.Response:
+    """Sends a POST request through the shared pooled session."""
+    return get_session().post(url, **kwargs)
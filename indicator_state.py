@@ -0,0 +1,205 @@
+import os
+import json
+import math
+import copy
+import numpy as np
+import pandas as pd
+from indicators import (
+    INDICATOR_COLUMNS, SMA_WINDOW, EMA_WINDOW, RSI_WINDOW, MACD_FAST, MACD_SLOW, MACD_SIGNAL,
+    BB_WINDOW, BB_DEV, STOCH_WINDOW, STOCH_SMOOTH, ICHIMOKU_CONV, ICHIMOKU_BASE, ICHIMOKU_SPAN_B,
+    compute_indicators
+)
+
+# --- Incremental Indicator State ---
+# Keeps the running state of every indicator per ticker (EMA/MACD/RSI smoothing
+# values, OBV total and the short trailing windows needed by the rolling
+# indicators) so each new bar is applied in constant time instead of
+# recomputing the whole window. State is persisted as JSON between runs.
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+STATE_DIR = os.path.join(SCRIPT_DIR, 'data', 'indicator_state')
+# Longest trailing window any indicator needs
+MAX_WINDOW = max(SMA_WINDOW, BB_WINDOW, STOCH_WINDOW, ICHIMOKU_BASE, ICHIMOKU_SPAN_B)
+
+def _state_path(ticker: str) -> str:
+    return os.path.join(STATE_DIR, f"{ticker}.json")
+
+def new_state() -> dict:
+    """Returns an empty indicator state (no bars seen yet)."""
+    return {
+        'first_date': None, 'last_date': None, 'count': 0, 'prev_close': None,
+        'ema': None, 'ema_fast': None, 'ema_slow': None,
+        'macd_signal': None, 'macd_count': 0,
+        'rsi_up': None, 'rsi_down': None, 'obv': 0.0,
+        'closes': [], 'highs': [], 'lows': [], 'stoch_k': [],
+        # State before the last bar was applied, so a revised last bar can be replaced
+        'previous': None
+    }
+
+def _ewm_step(value, x: float, alpha: float) -> float:
+    return x if value is None else alpha * x + (1 - alpha) * value
+
+def _window_mean(values: list, window: int) -> float:
+    if len(values) < window or any(math.isnan(v) for v in values[-window:]):
+        return float('nan')
+    return float(np.mean(values[-window:]))
+
+def _outputs(state: dict) -> dict:
+    """Derives the indicator values for the most recently applied bar."""
+    count = state['count']
+    closes, highs, lows = state['closes'], state['highs'], state['lows']
+    nan = float('nan')
+    out = {}
+    out['SMA'] = _window_mean(closes, SMA_WINDOW)
+    out['EMA'] = state['ema'] if count >= EMA_WINDOW else nan
+
+    if count >= RSI_WINDOW:
+        up, down = state['rsi_up'], state['rsi_down']
+        out['RSI'] = 100.0 if down == 0 else 100 - (100 / (1 + up / down))
+    else:
+        out['RSI'] = nan
+
+    out['MACD'] = state['ema_fast'] - state['ema_slow'] if count >= MACD_SLOW else nan
+    out['MACD_Signal'] = state['macd_signal'] if state['macd_count'] >= MACD_SIGNAL else nan
+
+    if count >= BB_WINDOW:
+        window = np.array(closes[-BB_WINDOW:])
+        mid, std = window.mean(), window.std()
+        out['BB_High'], out['BB_Low'] = mid + BB_DEV * std, mid - BB_DEV * std
+    else:
+        out['BB_High'] = out['BB_Low'] = nan
+
+    out['Stoch_k'] = state['stoch_k'][-1] if state['stoch_k'] else nan
+    out['Stoch_d'] = _window_mean(state['stoch_k'], STOCH_SMOOTH)
+    out['OBV'] = state['obv']
+
+    def midpoint(window):
+        return 0.5 * (max(highs[-window:]) + min(lows[-window:])) if count >= window else nan
+    out['Ichimoku_a'] = 0.5 * (midpoint(ICHIMOKU_CONV) + midpoint(ICHIMOKU_BASE))
+    # Span B uses partial windows from the first bar, like the batch engine
+    out['Ichimoku_b'] = 0.5 * (max(highs[-ICHIMOKU_SPAN_B:]) + min(lows[-ICHIMOKU_SPAN_B:]))
+    return out
+
+def apply_bar(state: dict, date, close: float, high: float, low: float, volume: float) -> dict:
+    """
+    Advances the state by one bar in place and returns that bar's indicator values.
+    If `date` equals the last applied bar, that bar is replaced (e.g. a revised
+    intraday close) by rolling back to the previous state first.
+    """
+    date = pd.Timestamp(date).isoformat()
+    if date == state['last_date'] and state['previous'] is not None:
+        rolled_back = state['previous']
+        state.clear()
+        state.update(rolled_back)
+    previous = copy.deepcopy({k: v for k, v in state.items() if k != 'previous'})
+
+    prev_close = state['prev_close']
+    diff = 0.0 if prev_close is None else close - prev_close
+    state['count'] += 1
+    state['ema'] = _ewm_step(state['ema'], close, 2.0 / (EMA_WINDOW + 1))
+    state['ema_fast'] = _ewm_step(state['ema_fast'], close, 2.0 / (MACD_FAST + 1))
+    state['ema_slow'] = _ewm_step(state['ema_slow'], close, 2.0 / (MACD_SLOW + 1))
+    if state['count'] >= MACD_SLOW:
+        state['macd_count'] += 1
+        state['macd_signal'] = _ewm_step(state['macd_signal'], state['ema_fast'] - state['ema_slow'], 2.0 / (MACD_SIGNAL + 1))
+    state['rsi_up'] = _ewm_step(state['rsi_up'], max(diff, 0.0), 1.0 / RSI_WINDOW)
+    state['rsi_down'] = _ewm_step(state['rsi_down'], max(-diff, 0.0), 1.0 / RSI_WINDOW)
+    state['obv'] += -volume if prev_close is not None and close < prev_close else volume
+    state['prev_close'] = close
+
+    state['closes'] = (state['closes'] + [close])[-MAX_WINDOW:]
+    state['highs'] = (state['highs'] + [high])[-MAX_WINDOW:]
+    state['lows'] = (state['lows'] + [low])[-MAX_WINDOW:]
+    if state['count'] >= STOCH_WINDOW:
+        lowest, highest = min(state['lows'][-STOCH_WINDOW:]), max(state['highs'][-STOCH_WINDOW:])
+        stoch_k = 100 * (close - lowest) / (highest - lowest) if highest != lowest else float('nan')
+    else:
+        stoch_k = float('nan')
+    state['stoch_k'] = (state['stoch_k'] + [stoch_k])[-STOCH_SMOOTH:]
+
+    state['first_date'] = state['first_date'] or date
+    state['last_date'] = date
+    state['previous'] = previous
+    return _outputs(state)
+
+def load_state(ticker: str) -> dict:
+    """Loads the persisted indicator state for a ticker (a fresh state if none exists)."""
+    path = _state_path(ticker)
+    if not os.path.exists(path):
+        return new_state()
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"   [WARN] Could not read indicator state for {ticker}, starting fresh: {e}")
+        return new_state()
+
+def save_state(ticker: str, state: dict):
+    os.makedirs(STATE_DIR, exist_ok=True)
+    tmp_path = _state_path(ticker) + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, _state_path(ticker))
+
+def advance_state(state: dict, bars: pd.DataFrame) -> pd.DataFrame:
+    """
+    Applies every bar in `bars` newer than (or equal to) the state's last bar.
+    Returns those bars with their indicator columns.
+    """
+    last_date = pd.Timestamp(state['last_date']) if state['last_date'] else None
+    new_bars = bars if last_date is None else bars[bars.index >= last_date]
+    rows = [
+        apply_bar(state, date, float(bar['Close']), float(bar['High']), float(bar['Low']), float(bar['Volume']))
+        for date, bar in new_bars.iterrows()
+    ]
+    return pd.DataFrame(rows, index=new_bars.index, columns=INDICATOR_COLUMNS)
+
+def update_indicator_state(ticker: str, bars: pd.DataFrame) -> pd.DataFrame:
+    """
+    Advances the persisted state for a ticker with the bars it hasn't seen yet,
+    saves it, and returns the indicator values for those bars.
+    Pass the ticker's full stored history (ohlcv_store.load_ohlcv) the first time.
+    """
+    state = load_state(ticker)
+    updates = advance_state(state, bars)
+    if not updates.empty:
+        save_state(ticker, state)
+    print(f"   [INFO] Indicator state for {ticker} advanced by {len(updates)} bar(s).")
+    return updates
+
+def verify_incremental(df: pd.DataFrame, rtol: float = 1e-8) -> bool:
+    """
+    Verification mode: replays `df` bar by bar through a fresh state and checks
+    every indicator against the batch computation used by fetch_data.
+    """
+    incremental = advance_state(new_state(), df)
+    batch = compute_indicators(df)[INDICATOR_COLUMNS]
+    ok = True
+    for column in INDICATOR_COLUMNS:
+        a, b = batch[column].to_numpy(dtype=float), incremental[column].to_numpy(dtype=float)
+        if not np.allclose(a, b, rtol=rtol, atol=0.0, equal_nan=True):
+            worst = np.nanmax(np.abs(a - b))
+            print(f"   [WARN] Incremental {column} diverges from the batch computation (max abs diff {worst:.3g}).")
+            ok = False
+    if ok:
+        print(f"   [SUCCESS] Incremental indicators match the batch computation over {len(df)} bars.")
+    return ok
+
+def verify_state(ticker: str, history: pd.DataFrame, rtol: float = 1e-8) -> bool:
+    """
+    Checks a ticker's persisted state against a batch computation over the same
+    history it was built from (`history` is typically ohlcv_store.load_ohlcv(ticker)).
+    """
+    state = load_state(ticker)
+    if state['last_date'] is None:
+        print(f"   [WARN] No indicator state stored for {ticker}.")
+        return False
+    window = history[(history.index >= pd.Timestamp(state['first_date'])) & (history.index <= pd.Timestamp(state['last_date']))]
+    expected = compute_indicators(window).iloc[-1]
+    actual = _outputs(state)
+    mismatched = [c for c in INDICATOR_COLUMNS
+                  if not np.isclose(expected[c], actual[c], rtol=rtol, atol=0.0, equal_nan=True)]
+    if mismatched:
+        print(f"   [WARN] Indicator state for {ticker} diverges from the batch computation: {', '.join(mismatched)}")
+        return False
+    print(f"   [SUCCESS] Indicator state for {ticker} matches the batch computation.")
+    return True
@@ -0,0 +1,163 @@
+import warnings
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# --- Vectorized Technical Indicator Engine ---
+# Computes the full indicator set used by fetch_data with NumPy over a 2-D
+# (time x asset) array, so a whole universe of coins is handled in one pass.
+# Formulas and warm-up periods mirror the `ta` package defaults that
+# fetch_data used previously, so the output columns are interchangeable.
+#
+# Each asset's series is right-aligned in the array (shorter histories are
+# NaN-padded at the top), which makes every column behave exactly as if the
+# indicator had been computed on that asset's frame on its own.
+
+SMA_WINDOW = 20
+EMA_WINDOW = 20
+RSI_WINDOW = 14
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+BB_WINDOW, BB_DEV = 20, 2
+STOCH_WINDOW, STOCH_SMOOTH = 14, 3
+ICHIMOKU_CONV, ICHIMOKU_BASE, ICHIMOKU_SPAN_B = 9, 26, 52
+
+INDICATOR_COLUMNS = [
+    'SMA', 'EMA', 'RSI', 'MACD', 'MACD_Signal', 'BB_High', 'BB_Low',
+    'Stoch_k', 'Stoch_d', 'OBV', 'Ichimoku_a', 'Ichimoku_b'
+]
+
+def _rolling(values: np.ndarray, window: int, func) -> np.ndarray:
+    """
+    Applies a reduction over a trailing window along the time axis.
+    With a NaN-propagating `func` (np.mean, np.max) any incomplete window yields
+    NaN, like pandas' min_periods=window; a NaN-aware `func` (np.nanmax) reduces
+    the partial windows at the start instead, like min_periods=0.
+    """
+    padded = np.concatenate([np.full((window - 1,) + values.shape[1:], np.nan), values])
+    windows = sliding_window_view(padded, window, axis=0)
+    with warnings.catch_warnings():
+        # All-NaN warm-up windows are expected and simply produce NaN
+        warnings.simplefilter('ignore', RuntimeWarning)
+        return func(windows, axis=-1)
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    return _rolling(values, window, np.mean)
+
+def rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    """Population (ddof=0) rolling standard deviation, as used by Bollinger Bands."""
+    return _rolling(values, window, np.std)
+
+def rolling_max(values: np.ndarray, window: int, partial: bool = False) -> np.ndarray:
+    return _rolling(values, window, np.nanmax if partial else np.max)
+
+def rolling_min(values: np.ndarray, window: int, partial: bool = False) -> np.ndarray:
+    return _rolling(values, window, np.nanmin if partial else np.min)
+
+def ewm(values: np.ndarray, alpha: float, min_periods: int) -> np.ndarray:
+    """
+    Recursive exponential moving average (pandas ewm(adjust=False)) along the
+    time axis. Each asset's recursion starts at its first non-NaN value and
+    results are masked until `min_periods` observations have been seen.
+    """
+    out = np.full(values.shape, np.nan)
+    state = np.full(values.shape[1:], np.nan)
+    seen = np.zeros(values.shape[1:], dtype=int)
+    for t in range(values.shape[0]):
+        x = values[t]
+        valid = ~np.isnan(x)
+        started = ~np.isnan(state)
+        state = np.where(valid & started, alpha * x + (1 - alpha) * state, state)
+        state = np.where(valid & ~started, x, state)
+        seen += valid
+        out[t] = np.where(seen >= min_periods, state, np.nan)
+    return out
+
+def ema(values: np.ndarray, span: int) -> np.ndarray:
+    return ewm(values, 2.0 / (span + 1), span)
+
+def compute_indicator_arrays(close: np.ndarray, high: np.ndarray, low: np.ndarray, volume: np.ndarray) -> dict:
+    """
+    Computes every indicator for a (time x asset) block of prices.
+    Returns {column name: (time x asset) array}.
+    """
+    results = {}
+    results['SMA'] = rolling_mean(close, SMA_WINDOW)
+    results['EMA'] = ema(close, EMA_WINDOW)
+
+    # RSI with Wilder smoothing; the first diff of each series counts as "no move"
+    diff = np.vstack([np.full((1,) + close.shape[1:], np.nan), np.diff(close, axis=0)])
+    has_price = ~np.isnan(close)
+    up = np.where(has_price, np.where(diff > 0, diff, 0.0), np.nan)
+    down = np.where(has_price, np.where(diff < 0, -diff, 0.0), np.nan)
+    ema_up = ewm(up, 1.0 / RSI_WINDOW, RSI_WINDOW)
+    ema_down = ewm(down, 1.0 / RSI_WINDOW, RSI_WINDOW)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        results['RSI'] = np.where(ema_down == 0, 100.0, 100 - (100 / (1 + ema_up / ema_down)))
+
+    macd = ema(close, MACD_FAST) - ema(close, MACD_SLOW)
+    results['MACD'] = macd
+    results['MACD_Signal'] = ema(macd, MACD_SIGNAL)
+
+    bb_mid = rolling_mean(close, BB_WINDOW)
+    bb_std = rolling_std(close, BB_WINDOW)
+    results['BB_High'] = bb_mid + BB_DEV * bb_std
+    results['BB_Low'] = bb_mid - BB_DEV * bb_std
+
+    lowest = rolling_min(low, STOCH_WINDOW)
+    highest = rolling_max(high, STOCH_WINDOW)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stoch_k = 100 * (close - lowest) / (highest - lowest)
+    results['Stoch_k'] = stoch_k
+    results['Stoch_d'] = rolling_mean(stoch_k, STOCH_SMOOTH)
+
+    prev_close = np.vstack([np.full((1,) + close.shape[1:], np.nan), close[:-1]])
+    signed_volume = np.where(close < prev_close, -volume, volume)
+    obv = np.nancumsum(signed_volume, axis=0)
+    results['OBV'] = np.where(np.isnan(signed_volume), np.nan, obv)
+
+    conversion = 0.5 * (rolling_max(high, ICHIMOKU_CONV) + rolling_min(low, ICHIMOKU_CONV))
+    base = 0.5 * (rolling_max(high, ICHIMOKU_BASE) + rolling_min(low, ICHIMOKU_BASE))
+    results['Ichimoku_a'] = 0.5 * (conversion + base)
+    # Span B uses partial windows from the first bar (ta's min_periods=0)
+    results['Ichimoku_b'] = 0.5 * (rolling_max(high, ICHIMOKU_SPAN_B, partial=True)
+                                   + rolling_min(low, ICHIMOKU_SPAN_B, partial=True))
+    return results
+
+def _stack(frames: list, column: str, length: int) -> np.ndarray:
+    """Right-aligns one column of every frame into a (length x assets) array."""
+    block = np.full((length, len(frames)), np.nan)
+    for j, df in enumerate(frames):
+        values = df[column].to_numpy(dtype=float)
+        block[length - len(values):, j] = values
+    return block
+
+def compute_indicators_batch(frames: dict) -> dict:
+    """
+    Adds the indicator columns to many OHLCV frames at once.
+    Takes {ticker: OHLCV DataFrame} and returns {ticker: DataFrame with indicators}.
+    """
+    frames = {ticker: df for ticker, df in frames.items() if df is not None and not df.empty}
+    if not frames:
+        return {}
+    tickers = list(frames)
+    ordered = [frames[t] for t in tickers]
+    length = max(len(df) for df in ordered)
+
+    arrays = compute_indicator_arrays(
+        _stack(ordered, 'Close', length), _stack(ordered, 'High', length),
+        _stack(ordered, 'Low', length), _stack(ordered, 'Volume', length)
+    )
+
+    results = {}
+    for j, (ticker, df) in enumerate(zip(tickers, ordered)):
+        out = df.copy()
+        for column in INDICATOR_COLUMNS:
+            out[column] = arrays[column][length - len(df):, j]
+        results[ticker] = out
+    return results
+
+def compute_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    """Adds the indicator columns to a single OHLCV frame."""
+    if df.empty:
+        return df.copy()
+    return compute_indicators_batch({'_': df})['_']
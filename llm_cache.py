@@ -0,0 +1,111 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+from contextlib import closing
+from llm_executor import estimate_tokens, reserve_tokens
+
+# --- LLM Response Cache ---
+# Persists chat completion responses in a local SQLite file, keyed on the model,
+# the exact messages and the sampling parameters, so an identical request
+# (a re-run on the same briefing, or sentiment over re-fetched headlines) is
+# answered from disk. Entries expire after a TTL and the least recently used
+# ones are evicted beyond a size limit. SQLite keeps it safe to share between
+# the runner's worker processes.
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_PATH = os.path.join(SCRIPT_DIR, 'data', 'cache', 'llm_cache.sqlite')
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "1") == "1"
+LLM_CACHE_TTL_HOURS = float(os.getenv("LLM_CACHE_TTL_HOURS", "24"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+
+def _connect() -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+    connection = sqlite3.connect(CACHE_PATH, timeout=30)
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS responses ("
+        "key TEXT PRIMARY KEY, model TEXT, content TEXT, created REAL, last_used REAL)"
+    )
+    connection.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER)")
+    return connection
+
+def request_key(model: str, messages: list, temperature: float = None, **params) -> str:
+    """Hashes everything that determines a completion: model, messages, temperature and other parameters."""
+    request = {'model': model, 'messages': messages, 'temperature': temperature, **params}
+    return hashlib.sha256(json.dumps(request, sort_keys=True, default=str).encode()).hexdigest()
+
+def _count(connection: sqlite3.Connection, name: str):
+    connection.execute(
+        "INSERT INTO stats (name, value) VALUES (?, 1) ON CONFLICT(name) DO UPDATE SET value = value + 1", (name,)
+    )
+
+def lookup(key: str):
+    """Returns the cached content for `key`, or None on a miss or expired entry."""
+    now = time.time()
+    with closing(_connect()) as connection, connection:
+        row = connection.execute("SELECT content, created FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None or now - row[1] > LLM_CACHE_TTL_HOURS * 3600:
+            _count(connection, 'misses')
+            return None
+        connection.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+        _count(connection, 'hits')
+        return row[0]
+
+def store(key: str, model: str, content: str):
+    """Stores a response, then drops expired entries and the least recently used beyond the size limit."""
+    now = time.time()
+    with closing(_connect()) as connection, connection:
+        connection.execute(
+            "INSERT OR REPLACE INTO responses (key, model, content, created, last_used) VALUES (?, ?, ?, ?, ?)",
+            (key, model, content, now, now)
+        )
+        connection.execute("DELETE FROM responses WHERE created < ?", (now - LLM_CACHE_TTL_HOURS * 3600,))
+        connection.execute(
+            "DELETE FROM responses WHERE key NOT IN "
+            "(SELECT key FROM responses ORDER BY last_used DESC LIMIT ?)", (LLM_CACHE_MAX_ENTRIES,)
+        )
+
+def cache_stats() -> dict:
+    """Returns the persistent hit/miss counters and the number of cached responses."""
+    with closing(_connect()) as connection, connection:
+        stats = dict(connection.execute("SELECT name, value FROM stats").fetchall())
+        entries = connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+    hits, misses = stats.get('hits', 0), stats.get('misses', 0)
+    return {
+        'hits': hits, 'misses': misses, 'entries': entries,
+        'hit_rate': hits / (hits + misses) if hits + misses else 0.0
+    }
+
+def cached_completion(client, model: str, messages: list, temperature: float = None, validate=None, **params) -> str:
+    """
+    Returns the content of a chat completion, from the cache when an identical request
+    was answered before. `params` are passed through to chat.completions.create and are
+    part of the key. A response is only cached if `validate(content)` (when given)
+    returns True, so malformed answers are retried next time.
+    """
+    key = request_key(model, messages, temperature, **params)
+    if LLM_CACHE_ENABLED:
+        try:
+            content = lookup(key)
+            if content is not None:
+                print(f"   [INFO] LLM response served from cache ({model}).")
+                return content
+        except sqlite3.Error as e:
+            print(f"   [WARN] LLM cache unavailable, calling the API: {e}")
+
+    # Only requests that actually reach the API spend the shared token budget
+    reserve_tokens(estimate_tokens(messages, params.get('max_tokens')))
+    completion = client.chat.completions.create(model=model, messages=messages, temperature=temperature, **params)
+    content = completion.choices[0].message.content
+
+    if LLM_CACHE_ENABLED:
+        try:
+            valid = validate is None or validate(content)
+        except Exception:
+            valid = False
+        if valid:
+            try:
+                store(key, model, content)
+            except sqlite3.Error as e:
+                print(f"   [WARN] Could not cache LLM response: {e}")
+    return content
@@ -0,0 +1,75 @@
+import os
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# --- Concurrent LLM Execution ---
+# Dispatches many independent LLM calls (e.g. the analyst and strategist for
+# every coin) at once on an asyncio loop, with a cap on in-flight requests and
+# a shared tokens-per-minute budget, so total LLM time tracks the slowest call
+# rather than the sum of all of them. The agent functions use the blocking
+# OpenAI client, so each call runs on a worker thread of a pool sized to the cap.
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "30000"))
+# Completion budget assumed for requests that don't set max_tokens
+DEFAULT_COMPLETION_TOKENS = 1000
+
+_bucket = {'available': float(LLM_TOKENS_PER_MINUTE), 'updated': time.monotonic()}
+_bucket_lock = threading.Lock()
+
+def estimate_tokens(messages: list, max_tokens: int = None) -> int:
+    """Rough request cost: ~4 characters per prompt token plus the completion budget."""
+    prompt_chars = sum(len(message.get('content') or '') for message in messages)
+    return prompt_chars // 4 + (max_tokens or DEFAULT_COMPLETION_TOKENS)
+
+def reserve_tokens(tokens: int):
+    """
+    Blocks until `tokens` fit in the per-minute token budget, then spends them.
+    Thread-safe; the budget refills continuously at LLM_TOKENS_PER_MINUTE.
+    A request larger than the whole budget waits for a full bucket.
+    """
+    tokens = min(tokens, LLM_TOKENS_PER_MINUTE)
+    while True:
+        with _bucket_lock:
+            now = time.monotonic()
+            refill = (now - _bucket['updated']) * LLM_TOKENS_PER_MINUTE / 60
+            _bucket['available'] = min(float(LLM_TOKENS_PER_MINUTE), _bucket['available'] + refill)
+            _bucket['updated'] = now
+            if _bucket['available'] >= tokens:
+                _bucket['available'] -= tokens
+                return
+            wait = (tokens - _bucket['available']) * 60 / LLM_TOKENS_PER_MINUTE
+        print(f"   [INFO] LLM token budget exhausted, waiting {wait:.1f}s...")
+        time.sleep(wait)
+
+async def _run_calls(calls: dict, max_concurrency: int) -> dict:
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        async def run(key, function, args):
+            async with semaphore:
+                try:
+                    return key, await loop.run_in_executor(executor, function, *args)
+                except Exception as e:
+                    print(f"   [ERROR] LLM call {key} failed: {e}")
+                    return key, None
+
+        results = await asyncio.gather(*(run(key, function, args) for key, (function, args) in calls.items()))
+    return dict(results)
+
+def run_llm_calls(calls: dict, max_concurrency: int = None) -> dict:
+    """
+    Runs independent LLM calls concurrently.
+    `calls` maps a key to (function, args); returns {key: result}, with None for a call that raised.
+    At most `max_concurrency` calls (default LLM_MAX_CONCURRENCY) are in flight at once.
+    """
+    if not calls:
+        return {}
+    max_concurrency = max(1, min(max_concurrency or LLM_MAX_CONCURRENCY, len(calls)))
+    started = time.perf_counter()
+    results = asyncio.run(_run_calls(calls, max_concurrency))
+    print(f"   [INFO] {len(calls)} LLM calls completed in {time.perf_counter() - started:.1f}s "
+          f"({max_concurrency} concurrent).")
+    return results
@@ -0,0 +1,132 @@
+import numpy as np
+
+# --- NumPy LSTM Inference ---
+# Runs the forward pass of the Sequential LSTM/Dense stack built by
+# forecasting._build_lstm_model from exported weights, so a prediction costs
+# a few small matrix products instead of a Keras predict() dispatch and does
+# not need TensorFlow to be imported at all.
+
+def export_weights(model) -> dict:
+    """
+    Extracts the weights of a trained Sequential LSTM/Dense model into plain arrays
+    (suitable for np.savez). Raises ValueError for layers or activations this
+    forward pass doesn't implement.
+    """
+    weights = {'layers': np.array([type(layer).__name__ for layer in model.layers])}
+    for i, layer in enumerate(model.layers):
+        config = layer.get_config()
+        kind = weights['layers'][i]
+        if kind == 'LSTM':
+            if config['activation'] != 'tanh' or config['recurrent_activation'] != 'sigmoid' or not config['use_bias']:
+                raise ValueError(f"Unsupported LSTM configuration in layer {layer.name}")
+            weights[f"{i}_kernel"], weights[f"{i}_recurrent"], weights[f"{i}_bias"] = layer.get_weights()
+            weights[f"{i}_return_sequences"] = np.array(config['return_sequences'])
+        elif kind == 'Dense':
+            if config['activation'] != 'linear' or not config['use_bias']:
+                raise ValueError(f"Unsupported Dense configuration in layer {layer.name}")
+            weights[f"{i}_kernel"], weights[f"{i}_bias"] = layer.get_weights()
+        else:
+            raise ValueError(f"Unsupported layer type {kind}")
+    return weights
+
+def _lstm_stack(x: np.ndarray, layers: list) -> np.ndarray:
+    """
+    Runs consecutive LSTM layers, each given as (kernel, recurrent, bias, return_sequences),
+    where every layer but the last returns sequences. Keras packs each layer's gates in the
+    order input, forget, cell, output.
+
+    The layers run as a wavefront: in iteration k layer j processes time step k - j, so
+    all layers advance together in one recurrence over a combined state, and a stack of
+    L layers takes steps + L - 1 iterations instead of L * steps. At a batch of one the
+    loop cost is almost all NumPy call overhead, so fewer, wider steps are what count.
+    """
+    batch, steps, _ = x.shape
+    sizes = [recurrent.shape[0] for _, recurrent, _, _ in layers]
+    offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(int)
+    total = offsets[-1]
+    dtype = layers[0][0].dtype
+
+    # Combined weights with the gates of all layers grouped as [input | forget | cell | output],
+    # each block ordered by layer. Layer j reads its own state and layer j - 1's output.
+    weights = np.zeros((total, 4 * total), dtype=dtype)
+    step_inputs = np.zeros((steps + len(layers) - 1, batch, 4 * total), dtype=dtype)
+    for j, (kernel, recurrent, bias, _) in enumerate(layers):
+        units, start = sizes[j], offsets[j]
+        for gate in range(4):
+            columns = slice(gate * total + start, gate * total + start + units)
+            layer_columns = slice(gate * units, (gate + 1) * units)
+            weights[start:start + units, columns] = recurrent[:, layer_columns]
+            if j == 0:
+                # Input projections for every time step at once; only the recurrence is sequential
+                step_inputs[:steps, :, columns] = (x @ kernel[:, layer_columns] + bias[layer_columns]).transpose(1, 0, 2)
+            else:
+                weights[offsets[j - 1]:start, columns] = kernel[:, layer_columns]
+                step_inputs[:, :, columns] = bias[layer_columns]
+
+    # sigmoid(x) == 0.5 * tanh(x / 2) + 0.5, so halving the sigmoid gates' pre-activations
+    # lets one tanh over the packed pre-activations serve all four gates
+    gate_scale = np.full(4 * total, 0.5, dtype=dtype)
+    gate_scale[2 * total:3 * total] = 1.0
+    weights *= gate_scale
+    step_inputs *= gate_scale
+    half = np.full(4 * total, 0.5, dtype=dtype)
+
+    # A single sequence is run on 1-D vectors, which NumPy dispatches noticeably faster
+    state_shape = (total,) if batch == 1 else (batch, total)
+    if batch == 1:
+        step_inputs = step_inputs[:, 0]
+    h = np.zeros(state_shape, dtype=dtype)
+    c = np.zeros(state_shape, dtype=dtype)
+    tanh_c = np.empty(state_shape, dtype=dtype)
+    cell_input = np.empty(state_shape, dtype=dtype)
+    z = np.empty(state_shape[:-1] + (4 * total,), dtype=dtype)
+    gates = np.empty_like(z)
+    input_gate, forget_gate, output_gate = gates[..., :total], gates[..., total:2 * total], gates[..., 3 * total:]
+    candidate = z[..., 2 * total:3 * total]
+    last = offsets[-2]
+    warmup = len(layers) - 1
+    return_sequences = layers[-1][3]
+    outputs = np.empty((batch, steps, sizes[-1]), dtype=dtype) if return_sequences else None
+
+    # Every buffer is allocated once and each iteration is a handful of in-place ufuncs
+    for k in range(len(step_inputs)):
+        np.dot(h, weights, out=z)
+        z += step_inputs[k]
+        np.tanh(z, out=z)
+        np.multiply(z, half, out=gates)
+        gates += half
+        c *= forget_gate
+        np.multiply(input_gate, candidate, out=cell_input)
+        c += cell_input
+        np.tanh(c, out=tanh_c)
+        np.multiply(output_gate, tanh_c, out=h)
+        if k < warmup:
+            # Layers the wavefront hasn't reached yet stay at their zero initial state
+            h[..., offsets[k + 1]:] = 0
+            c[..., offsets[k + 1]:] = 0
+        if return_sequences and k >= warmup:
+            outputs[:, k - warmup] = h[..., last:]
+    return outputs if return_sequences else h[..., last:].reshape(batch, sizes[-1])
+
+def predict(weights: dict, X: np.ndarray) -> np.ndarray:
+    """
+    Forward pass over a (batch, look_back, features) array, matching model.predict().
+    Computes in float32 like Keras.
+    """
+    x = np.asarray(X, dtype=np.float32)
+    kinds = list(weights['layers'])
+    i = 0
+    while i < len(kinds):
+        if kinds[i] == 'LSTM':
+            stack = []
+            while i < len(kinds) and kinds[i] == 'LSTM':
+                return_sequences = bool(weights[f"{i}_return_sequences"])
+                stack.append((weights[f"{i}_kernel"], weights[f"{i}_recurrent"], weights[f"{i}_bias"], return_sequences))
+                i += 1
+                if not return_sequences:
+                    break
+            x = _lstm_stack(x, stack)
+        else:
+            x = x @ weights[f"{i}_kernel"] + weights[f"{i}_bias"]
+            i += 1
+    return x
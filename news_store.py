@@ -0,0 +1,94 @@
+import os
+import time
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timedelta
+
+# --- Persistent News Article Store ---
+# Articles fetched from NewsAPI are kept in a local SQLite file keyed by URL,
+# together with their sentiment score once it has been computed. Each coin
+# records which articles mention it, so a run only needs to fetch articles
+# published after the newest one already stored for that coin, and an article
+# that mentions several coins is scored once. Articles older than the
+# retention window are pruned.
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+NEWS_DB_PATH = os.path.join(SCRIPT_DIR, 'data', 'news', 'articles.sqlite')
+NEWS_RETENTION_DAYS = int(os.getenv("NEWS_RETENTION_DAYS", "14"))
+
+def _connect() -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(NEWS_DB_PATH), exist_ok=True)
+    connection = sqlite3.connect(NEWS_DB_PATH, timeout=30)
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS articles ("
+        "url TEXT PRIMARY KEY, title TEXT, description TEXT, published_at TEXT, sentiment REAL, fetched REAL)"
+    )
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS coin_articles (coin TEXT, url TEXT, PRIMARY KEY (coin, url))"
+    )
+    connection.execute("CREATE INDEX IF NOT EXISTS articles_published ON articles (published_at)")
+    return connection
+
+def last_published(coin: str):
+    """Returns the newest stored publishedAt (ISO string) for `coin`, or None if nothing is stored."""
+    with closing(_connect()) as connection, connection:
+        row = connection.execute(
+            "SELECT MAX(a.published_at) FROM articles a JOIN coin_articles c ON a.url = c.url WHERE c.coin = ?",
+            (coin,)
+        ).fetchone()
+    return row[0]
+
+def add_articles(coin: str, articles: list) -> int:
+    """
+    Stores NewsAPI articles for `coin`. An article already stored (e.g. under another
+    coin) keeps its row and sentiment and is only linked to `coin`.
+    Returns the number of articles that were not stored before.
+    """
+    rows = [
+        (a['url'], a.get('title'), a.get('description'), a.get('publishedAt'), time.time())
+        for a in articles if a.get('url')
+    ]
+    with closing(_connect()) as connection, connection:
+        before = connection.total_changes
+        connection.executemany(
+            "INSERT OR IGNORE INTO articles (url, title, description, published_at, fetched) VALUES (?, ?, ?, ?, ?)",
+            rows
+        )
+        added = connection.total_changes - before
+        connection.executemany(
+            "INSERT OR IGNORE INTO coin_articles (coin, url) VALUES (?, ?)", [(coin, row[0]) for row in rows]
+        )
+    return added
+
+def recent_articles(coin: str, since: str, limit: int = None) -> list:
+    """Returns `coin`'s articles published at or after `since` (ISO string), newest first, as dicts."""
+    query = (
+        "SELECT a.url, a.title, a.description, a.published_at, a.sentiment FROM articles a "
+        "JOIN coin_articles c ON a.url = c.url WHERE c.coin = ? AND a.published_at >= ? "
+        "ORDER BY a.published_at DESC"
+    )
+    params = (coin, since)
+    if limit:
+        query += " LIMIT ?"
+        params += (limit,)
+    with closing(_connect()) as connection, connection:
+        rows = connection.execute(query, params).fetchall()
+    return [
+        {'url': url, 'title': title, 'description': description, 'publishedAt': published_at, 'sentiment': sentiment}
+        for url, title, description, published_at, sentiment in rows
+    ]
+
+def save_sentiments(scores: dict):
+    """Memoizes {url: sentiment score} for stored articles."""
+    with closing(_connect()) as connection, connection:
+        connection.executemany(
+            "UPDATE articles SET sentiment = ? WHERE url = ?", [(score, url) for url, score in scores.items()]
+        )
+
+def prune(retention_days: int = None):
+    """Deletes articles published before the retention window, and their coin links."""
+    cutoff = (datetime.utcnow() - timedelta(days=retention_days or NEWS_RETENTION_DAYS)).strftime('%Y-%m-%dT%H:%M:%SZ')
+    with closing(_connect()) as connection, connection:
+        connection.execute(
+            "DELETE FROM coin_articles WHERE url IN (SELECT url FROM articles WHERE published_at < ?)", (cutoff,)
+        )
+        connection.execute("DELETE FROM articles WHERE published_at < ?", (cutoff,))
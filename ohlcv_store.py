@@ -0,0 +1,146 @@
+import os
+import pandas as pd
+from datetime import datetime, timedelta
+
+# --- Local OHLCV Store ---
+# One Parquet file per ticker, indexed by bar date. Each run only downloads
+# the bars after the last stored one and serves the requested window from disk.
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+OHLCV_DIR = os.path.join(SCRIPT_DIR, 'data', 'ohlcv')
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
+
+def _store_path(ticker: str) -> str:
+    return os.path.join(OHLCV_DIR, f"{ticker}.parquet")
+
+def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+    """Flattens yfinance output into a plain OHLCV frame indexed by naive bar date."""
+    if df is None or df.empty:
+        return pd.DataFrame(columns=OHLCV_COLUMNS)
+    if isinstance(df.columns, pd.MultiIndex): df.columns = df.columns.get_level_values(0)
+    df = df[[c for c in OHLCV_COLUMNS if c in df.columns]].copy()
+    df.index = pd.to_datetime(df.index)
+    if df.index.tz is not None:
+        df.index = df.index.tz_localize(None)
+    df.index.name = 'Date'
+    return df.dropna(how='all')
+
+def load_ohlcv(ticker: str) -> pd.DataFrame:
+    """Loads every stored bar for a ticker (empty frame if nothing is stored yet)."""
+    path = _store_path(ticker)
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=OHLCV_COLUMNS)
+    try:
+        return pd.read_parquet(path)
+    except Exception as e:
+        print(f"   [WARN] Could not read OHLCV store for {ticker}, rebuilding it: {e}")
+        return pd.DataFrame(columns=OHLCV_COLUMNS)
+
+def merge_ohlcv(ticker: str, new_bars: pd.DataFrame) -> pd.DataFrame:
+    """
+    Merges freshly downloaded bars into the stored history and persists the result.
+    Newer data wins for overlapping dates, so a partially-formed last bar gets replaced.
+    """
+    stored = load_ohlcv(ticker)
+    new_bars = _normalize(new_bars)
+    if new_bars.empty:
+        return stored
+    merged = pd.concat([stored, new_bars]) if not stored.empty else new_bars
+    merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+
+    os.makedirs(OHLCV_DIR, exist_ok=True)
+    # Write to a temp file first so a crash never leaves a truncated store behind
+    tmp_path = _store_path(ticker) + ".tmp"
+    merged.to_parquet(tmp_path)
+    os.replace(tmp_path, _store_path(ticker))
+    return merged
+
+def update_ohlcv(ticker: str, days: int = 180, interval: str = "1d") -> pd.DataFrame:
+    """
+    Brings the stored history for a ticker up to date and returns all stored bars.
+    Only the tail since the last stored bar is downloaded; the full `days` window is
+    only fetched when the store is empty or doesn't reach back far enough.
+    """
+    stored = load_ohlcv(ticker)
+    window_start = pd.Timestamp(datetime.now().date() - timedelta(days=days))
+
+    # yfinance is slow to import and only needed when downloading
+    import yfinance as yf
+    if stored.empty or stored.index[0] > window_start + timedelta(days=3):
+        print(f"   [INFO] Downloading {days} days of history for {ticker} into the local store...")
+        new_bars = yf.download(tickers=ticker, period=f"{days}d", interval=interval, progress=False, auto_adjust=False)
+    else:
+        # Re-fetch the last stored bar too, since it may have been captured mid-day
+        start = stored.index[-1].strftime('%Y-%m-%d')
+        print(f"   [INFO] Fetching new bars for {ticker} since {start}...")
+        new_bars = yf.download(tickers=ticker, start=start, interval=interval, progress=False, auto_adjust=False)
+    return merge_ohlcv(ticker, new_bars)
+
+def get_ohlcv(ticker: str, days: int = 180, interval: str = "1d", refresh: bool = True) -> pd.DataFrame:
+    """Returns the last `days` days of bars for a ticker, updating the local store first unless refresh=False."""
+    df = update_ohlcv(ticker, days=days, interval=interval) if refresh else load_ohlcv(ticker)
+    if df.empty:
+        return df
+    window_start = df.index[-1] - timedelta(days=days - 1)
+    return df[df.index >= window_start].copy()
+
+def _split_batch(batch: pd.DataFrame, tickers: list) -> dict:
+    """Splits a multi-ticker yfinance frame into one OHLCV frame per ticker."""
+    frames = {}
+    if batch is None or batch.empty:
+        return frames
+    if not isinstance(batch.columns, pd.MultiIndex):
+        # A single-ticker download may come back flat
+        return {tickers[0]: batch} if len(tickers) == 1 else frames
+    # group_by='ticker' puts the ticker on level 0, the default layout puts it on level 1
+    ticker_level = 0 if set(tickers) & set(batch.columns.get_level_values(0)) else 1
+    available = set(batch.columns.get_level_values(ticker_level))
+    for ticker in tickers:
+        if ticker not in available:
+            continue
+        frame = batch.xs(ticker, axis=1, level=ticker_level).dropna(how='all')
+        if not frame.empty:
+            frames[ticker] = frame
+    return frames
+
+def update_ohlcv_batch(tickers: list, days: int = 180, interval: str = "1d", chunk_size: int = 50) -> dict:
+    """
+    Brings the stored history for many tickers up to date using multi-ticker
+    yfinance downloads (one request per chunk of `chunk_size` tickers).
+    Tickers needing a full history and tickers needing only a tail are batched
+    separately. Returns {ticker: all stored bars} for the tickers that were updated.
+    """
+    window_start = pd.Timestamp(datetime.now().date() - timedelta(days=days))
+    full_history, tail_starts = [], {}
+    for ticker in tickers:
+        stored = load_ohlcv(ticker)
+        if stored.empty or stored.index[0] > window_start + timedelta(days=3):
+            full_history.append(ticker)
+        else:
+            tail_starts[ticker] = stored.index[-1]
+
+    groups = []
+    if full_history:
+        groups.append((full_history, {'period': f"{days}d"}))
+    if tail_starts:
+        # One shared start date for the whole tail group; overlapping bars are de-duplicated on merge
+        start = min(tail_starts.values()).strftime('%Y-%m-%d')
+        groups.append((list(tail_starts), {'start': start}))
+
+    import yfinance as yf
+    updated = {}
+    for group, window in groups:
+        for i in range(0, len(group), chunk_size):
+            chunk = group[i:i + chunk_size]
+            print(f"   [INFO] Batch-downloading {len(chunk)} tickers ({window})...")
+            try:
+                batch = yf.download(tickers=chunk, interval=interval, group_by='ticker',
+                                    progress=False, auto_adjust=False, threads=True, **window)
+            except Exception as e:
+                print(f"   [WARN] Batch download failed for {chunk}: {e}")
+                continue
+            for ticker, frame in _split_batch(batch, chunk).items():
+                updated[ticker] = merge_ohlcv(ticker, frame)
+    missing = [t for t in tickers if t not in updated]
+    if missing:
+        print(f"   [WARN] No batch data returned for: {', '.join(missing)}")
+    return updated
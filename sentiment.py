@@ -1,48 +1,185 @@
 import os
-import requests
-import openai
+import json
+import http_client
+from llm_cache import cached_completion
+from llm_executor import run_llm_calls
 import re
+import numpy as np
+import news_store
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 
-def get_news_sentiment(coin_ticker: str, coin_name: str, api_key: str) -> tuple:
+# --- Batched Sentiment ---
+# Headlines for many coins are scored in one JSON-mode request per chunk, with
+# chunks sized to a prompt-token budget, instead of one request per coin.
+SENTIMENT_BATCH_MODEL = "gpt-4-turbo"
+SENTIMENT_BATCH_TOKENS = int(os.getenv("SENTIMENT_BATCH_TOKENS", "6000"))
+# Headlines scored per coin and articles kept for the briefing
+HEADLINES_PER_COIN = 10
+TOP_ARTICLES = 5
+
+# --- Local Lexicon Sentiment ---
+# "llm" scores headlines with the OpenAI API and falls back to the lexicon when a call
+# fails or times out; "lexicon" skips the network entirely.
+SENTIMENT_ENGINE = os.getenv("SENTIMENT_ENGINE", "llm")
+# Seconds before an LLM sentiment request is abandoned in favour of the lexicon
+SENTIMENT_LLM_TIMEOUT = float(os.getenv("SENTIMENT_LLM_TIMEOUT", "20"))
+# Word polarities from -1.0 (bearish) to 1.0 (bullish) for crypto and market news
+SENTIMENT_LEXICON = {
+    # Bullish
+    "surge": 0.8, "surges": 0.8, "surged": 0.8, "soar": 0.8, "soars": 0.8, "soared": 0.8,
+    "rally": 0.7, "rallies": 0.7, "rallied": 0.7, "jump": 0.5, "jumps": 0.5, "jumped": 0.5,
+    "gain": 0.5, "gains": 0.5, "gained": 0.5, "rise": 0.4, "rises": 0.4, "rising": 0.4, "rose": 0.4,
+    "climb": 0.4, "climbs": 0.4, "climbed": 0.4, "rebound": 0.5, "rebounds": 0.5, "recovery": 0.4, "recovers": 0.4,
+    "bull": 0.6, "bullish": 0.8, "breakout": 0.6, "ath": 0.6, "boom": 0.6,
+    "adoption": 0.5, "approval": 0.6, "approved": 0.6, "approves": 0.6, "etf": 0.2, "inflows": 0.5, "inflow": 0.5,
+    "partnership": 0.4, "upgrade": 0.4, "launch": 0.3, "launches": 0.3, "growth": 0.4, "strong": 0.4,
+    "optimism": 0.5, "optimistic": 0.5, "positive": 0.4, "buy": 0.3, "buying": 0.3, "accumulation": 0.4,
+    "outperform": 0.5, "outperforms": 0.5, "support": 0.2, "win": 0.5, "wins": 0.5, "profit": 0.4, "profits": 0.4,
+    # Bearish
+    "crash": -0.9, "crashes": -0.9, "crashed": -0.9, "plunge": -0.8, "plunges": -0.8, "plunged": -0.8,
+    "tumble": -0.7, "tumbles": -0.7, "tumbled": -0.7, "slump": -0.7, "slumps": -0.7, "dump": -0.6, "dumps": -0.6,
+    "drop": -0.5, "drops": -0.5, "dropped": -0.5, "fall": -0.5, "falls": -0.5, "fell": -0.5, "falling": -0.5,
+    "decline": -0.4, "declines": -0.4, "declined": -0.4, "slide": -0.4, "slides": -0.4, "loss": -0.5, "losses": -0.5,
+    "bear": -0.6, "bearish": -0.8, "selloff": -0.7, "sell": -0.3, "selling": -0.3, "liquidation": -0.6,
+    "liquidations": -0.6, "outflows": -0.5, "outflow": -0.5, "atl": -0.6, "weak": -0.4, "fear": -0.6, "panic": -0.8,
+    "hack": -0.9, "hacked": -0.9, "exploit": -0.8, "scam": -0.9, "fraud": -0.9, "lawsuit": -0.6, "sues": -0.6,
+    "ban": -0.7, "bans": -0.7, "banned": -0.7, "crackdown": -0.7, "investigation": -0.5, "probe": -0.5,
+    "risk": -0.3, "risks": -0.3, "warning": -0.5, "warns": -0.5, "concern": -0.4, "concerns": -0.4,
+    "volatility": -0.2, "uncertainty": -0.4, "delay": -0.4, "delays": -0.4, "rejected": -0.6, "rejects": -0.6,
+    "bankruptcy": -0.9, "insolvency": -0.9, "collapse": -0.9, "collapses": -0.9, "negative": -0.4,
+}
+# A negator flips the polarity of the next polarity-bearing word within NEGATION_WINDOW
+# tokens in the same headline ("not approved", "fails to rally", "not expected to surge").
+# A failure with nothing polar after it negates what came before ("approval failed to materialize").
+SENTIMENT_NEGATORS = {"not", "no", "never", "without", "fails", "failed"}
+SENTIMENT_BACKWARD_NEGATORS = {"fails", "failed"}
+NEGATION_WINDOW = 3
+# Phrases rewritten before tokenizing. "High"/"low" carry no polarity on their own
+# ("falls from record high"), so only records reached count, as "ath"/"atl", and a
+# record mentioned as the starting point ("from record high") is dropped.
+# Multi-word negators become a single "not".
+SENTIMENT_PHRASES = [
+    (re.compile(r"\bfrom (?:an? |its |the )?(?:record|all[- ]time|new) (?:highs?|lows?)\b"), " "),
+    (re.compile(r"\b(?:record|all[- ]time|new) highs?\b"), " ath "),
+    (re.compile(r"\b(?:record|all[- ]time|new) lows?\b"), " atl "),
+    (re.compile(r"\b(?:no longer|not expected)\b"), " not "),
+    (re.compile(r"\bfail(?:s|ed)? to\b"), " fails "),
+]
+# Normalization constant: a headline scores sum / sqrt(sum^2 + alpha), so it stays within (-1, 1)
+LEXICON_ALPHA = 4.0
+_TOKEN_PATTERN = re.compile(r"[a-z]+")
+
+def fetch_news(coin_name: str, api_key: str, since: str = None) -> list:
+    """
+    Returns the NewsAPI articles about `coin_name` from the last 3 days, newest first,
+    or only those published at or after `since` (an ISO timestamp) when given.
+    """
+    from_date = since.rstrip('Z') if since else (datetime.now() - timedelta(days=3)).strftime('%Y-%m-%d')
+    url = (f'https://newsapi.org/v2/everything?q={coin_name}&from={from_date}&sortBy=publishedAt&language=en&apiKey={api_key}')
+
+    response = http_client.get(url)
+    response.raise_for_status()
+    return response.json().get("articles", [])
+
+def _headline(article: dict) -> str:
+    return f"Title: {article['title']}. Desc: {article.get('description', '')}"
+
+def _top_articles(articles: list) -> list:
+    return [{"title": a['title'], "url": a['url']} for a in articles[:TOP_ARTICLES]]
+
+def lexicon_scores(headlines: list) -> np.ndarray:
+    """
+    Scores each headline from -1.0 to 1.0 with the bundled SENTIMENT_LEXICON.
+    The text is tokenized once; the lookup, negation and per-headline sums run as
+    array operations over every token of every headline at once.
+    """
+    tokens, owners = [], []
+    for i, headline in enumerate(headlines):
+        text = (headline or "").lower()
+        for pattern, replacement in SENTIMENT_PHRASES:
+            text = pattern.sub(replacement, text)
+        words = _TOKEN_PATTERN.findall(text)
+        tokens.extend(words)
+        owners.extend([i] * len(words))
+    if not tokens:
+        return np.zeros(len(headlines))
+    owners = np.array(owners)
+    weights = np.array([SENTIMENT_LEXICON.get(token, 0.0) for token in tokens])
+    # Each negator flips the first polarity-bearing word among the next NEGATION_WINDOW
+    # tokens of its own headline, and a backward negator that found none looks back as far.
+    # Each window is scanned one offset at a time for all negators together.
+    negated = np.zeros(len(tokens), dtype=bool)
+
+    def negate(pending, offsets):
+        """Flips each negator's first polar word at `offsets`; returns the negators that found none."""
+        for offset in offsets:
+            target = np.clip(pending + offset, 0, len(tokens) - 1)
+            hit = (target == pending + offset) & (owners[target] == owners[pending]) & (weights[target] != 0)
+            negated[target[hit]] = True
+            pending = pending[~hit]
+        return pending
+
+    unmatched = negate(np.flatnonzero([token in SENTIMENT_NEGATORS for token in tokens]), range(1, NEGATION_WINDOW + 1))
+    backward = np.array([tokens[i] in SENTIMENT_BACKWARD_NEGATORS for i in unmatched], dtype=bool)
+    negate(unmatched[backward], range(-1, -NEGATION_WINDOW - 1, -1))
+    weights[negated] *= -1
+    totals = np.bincount(owners, weights=weights, minlength=len(headlines))
+    return totals / np.sqrt(totals ** 2 + LEXICON_ALPHA)
+
+def get_news_sentiment(coin_ticker: str, coin_name: str, api_key: str, use_store: bool = True) -> tuple:
     """
     Fetches recent news, returns a sentiment score from GPT, and the top articles.
+    Goes through the persistent news_store like get_news_sentiment_batch unless
+    `use_store` is False or the store fails, in which case the last 3 days of news
+    are fetched and scored directly.
     Returns:
         tuple: A (score, articles_list) tuple.
     """
     print(f"   [INFO] Starting sentiment analysis for {coin_ticker}...")
-    try:
-        if not api_key:
-            print("   [WARN] NewsAPI key was not provided. Skipping.")
-            return 0.0, []
-
-        from_date = (datetime.now() - timedelta(days=3)).strftime('%Y-%m-%d')
-        url = (f'https://newsapi.org/v2/everything?q={coin_name}&from={from_date}&sortBy=publishedAt&language=en&apiKey={api_key}')
+    if not api_key:
+        print("   [WARN] NewsAPI key was not provided. Skipping.")
+        return 0.0, []
+    if use_store:
+        try:
+            return _stored_news_sentiment({coin_ticker: coin_name}, api_key)[coin_ticker]
+        except Exception as e:
+            print(f"   [WARN] News article store unavailable, scoring fetched news directly: {e}")
 
-        response = requests.get(url)
-        response.raise_for_status()
-        
-        articles = response.json().get("articles", [])
+    try:
+        articles = fetch_news(coin_name, api_key)
         if not articles:
             print(f"   [WARN] No recent news articles found for {coin_name}.")
             return 0.0, []
 
-        top_articles = [{"title": a['title'], "url": a['url']} for a in articles[:5]]
-        headlines_for_analysis = [f"Title: {a['title']}. Desc: {a.get('description', '')}" for a in articles[:10]]
+        top_articles = _top_articles(articles)
+        headlines_for_analysis = [_headline(a) for a in articles[:HEADLINES_PER_COIN]]
+        if SENTIMENT_ENGINE == "lexicon":
+            final_score = float(lexicon_scores(headlines_for_analysis).mean())
+            print(f"   [SUCCESS] Lexicon sentiment analysis complete. Score: {final_score:.2f}")
+            return final_score, top_articles
         news_text = "\n".join(headlines_for_analysis)
 
-        client = openai.OpenAI()
-        completion = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are a financial sentiment analyst. Based on the news headlines, provide a single sentiment score from -1.0 to 1.0. Respond with only the numerical score."},
-                {"role": "user", "content": f"Analyze sentiment for {coin_name} from these articles:\n\n{news_text}"}
-            ],
-            temperature=0.0,
-            max_tokens=10
-        )
-        
-        content = completion.choices[0].message.content
+        try:
+            import openai
+            client = openai.OpenAI(timeout=SENTIMENT_LLM_TIMEOUT)
+            # Re-fetched headlines that were already scored are answered from the cache
+            content = cached_completion(
+                client,
+                model="gpt-4",
+                messages=[
+                    {"role": "system", "content": "You are a financial sentiment analyst. Based on the news headlines, provide a single sentiment score from -1.0 to 1.0. Respond with only the numerical score."},
+                    {"role": "user", "content": f"Analyze sentiment for {coin_name} from these articles:\n\n{news_text}"}
+                ],
+                temperature=0.0,
+                max_tokens=10,
+                validate=lambda content: re.search(r"(-?\d+\.?\d*)", content) is not None
+            )
+        except Exception as e:
+            final_score = float(lexicon_scores(headlines_for_analysis).mean())
+            print(f"   [WARN] LLM sentiment failed ({e}); using the lexicon score: {final_score:.2f}")
+            return final_score, top_articles
+
         match = re.search(r"(-?\d+\.?\d*)", content)
         if match:
             score = float(match.group(0))
@@ -55,4 +192,187 @@ def get_news_sentiment(coin_ticker: str, coin_name: str, api_key: str) -> tuple:
 
     except Exception as e:
         print(f"   [ERROR] Sentiment analysis error: {e}")
-        return 0.0, []
\ No newline at end of file
+        return 0.0, []
+
+def _clamp_score(value) -> float:
+    return max(-1.0, min(1.0, float(value)))
+
+def _completion_budget(headline_count: int) -> int:
+    # A coin's entry is a score plus one short number per headline
+    return 16 + 8 * headline_count
+
+def chunk_by_token_budget(headlines_by_coin: dict, token_budget: int = None) -> list:
+    """
+    Splits {coin: {'name', 'headlines'}} into chunks whose prompt and completion
+    (~4 characters per token) fit in `token_budget` (default SENTIMENT_BATCH_TOKENS).
+    A coin that alone exceeds the budget gets a chunk of its own.
+    """
+    token_budget = token_budget or SENTIMENT_BATCH_TOKENS
+    chunks, chunk, used = [], {}, 0
+    for coin, entry in headlines_by_coin.items():
+        cost = len(json.dumps({coin: entry})) // 4 + _completion_budget(len(entry['headlines']))
+        if chunk and used + cost > token_budget:
+            chunks.append(chunk)
+            chunk, used = {}, 0
+        chunk[coin] = entry
+        used += cost
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+def _is_valid_batch(response, chunk: dict) -> bool:
+    return isinstance(response, dict) and all(
+        isinstance(response.get(coin), dict) and isinstance(response[coin].get("score"), (int, float))
+        for coin in chunk
+    )
+
+def _score_chunk(chunk: dict) -> dict:
+    import openai
+    client = openai.OpenAI(timeout=SENTIMENT_LLM_TIMEOUT)
+    content = cached_completion(
+        client,
+        model=SENTIMENT_BATCH_MODEL,
+        messages=[
+            {"role": "system", "content": (
+                "You are a financial sentiment analyst. You receive a JSON object mapping each coin's ID to its name "
+                "and recent news headlines. Respond with a JSON object with the same coin IDs as keys, each mapping to "
+                "{\"score\": overall sentiment for that coin from -1.0 to 1.0, \"headlines\": a list with one score "
+                "from -1.0 to 1.0 per headline, in the given order}. Respond with only the JSON object."
+            )},
+            {"role": "user", "content": json.dumps(chunk)}
+        ],
+        temperature=0.0,
+        max_tokens=sum(_completion_budget(len(entry['headlines'])) for entry in chunk.values()),
+        response_format={"type": "json_object"},
+        # Only responses that score every coin in the chunk are cached
+        validate=lambda content: _is_valid_batch(json.loads(content), chunk)
+    )
+    response = json.loads(content)
+
+    scores = {}
+    for coin, entry in chunk.items():
+        result = response.get(coin) if isinstance(response, dict) else None
+        try:
+            headline_scores = [_clamp_score(score) for score in result.get("headlines", [])][:len(entry['headlines'])]
+            scores[coin] = {"score": _clamp_score(result["score"]), "headlines": headline_scores}
+        except (AttributeError, KeyError, TypeError, ValueError):
+            print(f"   [WARN] No usable sentiment score for {entry['name']} in the batch response.")
+    return scores
+
+def _score_headlines_llm(headlines_by_coin: dict, token_budget: int = None) -> dict:
+    """
+    Scores the headlines of many coins with as few LLM requests as the token budget allows.
+    `headlines_by_coin` maps a coin ID to {'name': ..., 'headlines': [...]}; returns
+    {coin: {'score': float, 'headlines': [per-headline scores]}}, leaving out coins whose
+    chunk failed or timed out or that the model skipped.
+    """
+    chunks = chunk_by_token_budget(headlines_by_coin, token_budget)
+    if not chunks:
+        return {}
+    print(f"   [INFO] Scoring sentiment for {len(headlines_by_coin)} coins in {len(chunks)} batched request(s)...")
+    # The chunks are independent, so they are dispatched concurrently like the agent calls
+    responses = run_llm_calls({i: (_score_chunk, (chunk,)) for i, chunk in enumerate(chunks)})
+    scores = {}
+    for result in responses.values():
+        scores.update(result or {})
+    return scores
+
+def score_new_articles(coins: dict, stored: dict) -> dict:
+    """
+    Scores the stored articles that have no memoized sentiment yet and returns {url: score}.
+    `stored` maps ticker -> its recent stored articles. An article listed under several
+    coins is scored once, with the first coin that lists it. LLM scores are memoized in
+    the article store; lexicon scores (the engine, or the fallback for articles the LLM
+    couldn't score) are cheap and recomputed each run, so a transient API failure doesn't
+    pin an article to its fallback score.
+    """
+    pending, assigned = {}, set()
+    for ticker, articles in stored.items():
+        new = [a for a in articles if a['sentiment'] is None and a['url'] not in assigned]
+        assigned.update(a['url'] for a in new)
+        if new:
+            pending[ticker] = new
+    if not pending:
+        return {}
+
+    scores = {}
+    if SENTIMENT_ENGINE != "lexicon":
+        try:
+            llm_scores = _score_headlines_llm(
+                {ticker: {"name": coins[ticker], "headlines": [_headline(a) for a in new]} for ticker, new in pending.items()}
+            )
+        except Exception as e:
+            print(f"   [ERROR] Batched sentiment analysis error: {e}")
+            llm_scores = {}
+        for ticker, result in llm_scores.items():
+            scores.update(zip((a['url'] for a in pending[ticker]), result["headlines"]))
+        news_store.save_sentiments(scores)
+
+    unscored = [a for new in pending.values() for a in new if a['url'] not in scores]
+    if unscored:
+        if SENTIMENT_ENGINE != "lexicon":
+            print(f"   [WARN] Falling back to lexicon sentiment for {len(unscored)} article(s).")
+        scores.update(zip((a['url'] for a in unscored), lexicon_scores([_headline(a) for a in unscored]).tolist()))
+    print(f"   [INFO] Scored {len(scores)} new article(s).")
+    return scores
+
+def get_news_sentiment_batch(coins: dict, api_key: str) -> dict:
+    """
+    Batched counterpart of get_news_sentiment for a whole universe.
+    `coins` maps ticker -> coin name; returns {ticker: (score, top_articles)} with the
+    same tuple as get_news_sentiment, where each top article also carries its own
+    'sentiment' score. If the article store fails, every coin falls back to the
+    per-coin path without the store, so sentiment errors never stop the run.
+    """
+    if not api_key:
+        print("   [WARN] NewsAPI key was not provided. Skipping.")
+        return {ticker: (0.0, []) for ticker in coins}
+    try:
+        return _stored_news_sentiment(coins, api_key)
+    except Exception as e:
+        print(f"   [ERROR] Batched sentiment analysis failed, scoring each coin separately: {e}")
+        return {ticker: get_news_sentiment(ticker, name, api_key, use_store=False) for ticker, name in coins.items()}
+
+def _stored_news_sentiment(coins: dict, api_key: str) -> dict:
+    """
+    Sentiment through the persistent news_store: each coin only fetches articles newer
+    than the newest one already stored for it, only articles without a memoized score
+    are scored, and a coin's score is the mean over its most recent stored articles
+    (up to HEADLINES_PER_COIN from the last 3 days). Store errors propagate.
+    """
+    window_start = (datetime.utcnow() - timedelta(days=3)).strftime('%Y-%m-%dT%H:%M:%SZ')
+    news_store.prune()
+
+    def fetch(ticker):
+        try:
+            last_seen = news_store.last_published(ticker)
+            since = max(last_seen, window_start) if last_seen else None
+            return fetch_news(coins[ticker], api_key, since=since)
+        except Exception as e:
+            print(f"   [ERROR] News fetch failed for {ticker}: {e}")
+            return None
+
+    # NewsAPI queries are independent; the shared HTTP session bounds connections per host
+    with ThreadPoolExecutor(max_workers=max(1, min(len(coins), http_client.MAX_CONNECTIONS_PER_HOST))) as executor:
+        fetched = dict(zip(coins, executor.map(fetch, coins)))
+    added = sum(news_store.add_articles(ticker, articles) for ticker, articles in fetched.items() if articles)
+    print(f"   [INFO] Fetched {sum(len(a) for a in fetched.values() if a)} article(s), {added} not seen before.")
+
+    # A failed fetch still falls back on what earlier runs stored for the coin
+    stored = {ticker: news_store.recent_articles(ticker, window_start, HEADLINES_PER_COIN) for ticker in coins}
+    scores = score_new_articles(coins, stored)
+
+    results = {}
+    for ticker, articles in stored.items():
+        if not articles:
+            print(f"   [WARN] No recent news articles found for {coins[ticker]}.")
+            results[ticker] = (0.0, [])
+            continue
+        article_scores = [a['sentiment'] if a['sentiment'] is not None else scores[a['url']] for a in articles]
+        top_articles = [
+            {"title": a['title'], "url": a['url'], "sentiment": score}
+            for a, score in zip(articles[:TOP_ARTICLES], article_scores)
+        ]
+        results[ticker] = (_clamp_score(np.mean(article_scores)), top_articles)
+    print(f"   [SUCCESS] Sentiment analysis complete for {len(coins)} coin(s).")
+    return results
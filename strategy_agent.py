@@ -1,12 +1,34 @@
 import os
 import json
-import openai
+from llm_cache import cached_completion
 import logging
 
 # Configure basic logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Trade keys and their instructions, shared with the combined analyst+strategist agent
+REQUIRED_KEYS = ["action", "entry_range", "tp1", "tp2", "sl", "confidence", "rationale"]
+TRADE_FORMAT = """
+    1. "action": (String) "BUY", "SELL", or "HOLD".
+    2. "entry_range": (String) The recommended price range for entry (e.g., "65000.00 - 65500.00"). If HOLD, use "N/A".
+    3. "tp1": (Float) Take Profit Target 1 (Realistic short-term target).
+    4. "tp2": (Float) Take Profit Target 2 (Optimistic target).
+    5. "sl": (Float) Stop Loss (Critical risk management level; must be defined for BUY/SELL).
+    6. "confidence": (Float) Confidence score from 0.0 (low confluence) to 1.0 (high confluence).
+    7. "rationale": (String) A concise, 2-3 sentence explanation citing the specific data points supporting the recommendation.
+    """
+
+def default_recommendation() -> dict:
+    """A safe HOLD recommendation used whenever the AI output can't be used."""
+    return {
+        "action": "HOLD", "entry_range": "N/A", "tp1": 0.0, "tp2": 0.0, "sl": 0.0, "confidence": 0.0,
+        "rationale": "Strategy generation failed."
+    }
+
+def is_valid_recommendation(recommendation) -> bool:
+    return isinstance(recommendation, dict) and all(key in recommendation for key in REQUIRED_KEYS)
+
 def get_trade_recommendation(daily_briefing_data: dict) -> dict:
     """
     Sends the daily data briefing to the GPT-4 API, prompting it to act
@@ -69,40 +91,31 @@ def get_trade_recommendation(daily_briefing_data: dict) -> dict:
 
     --- OUTPUT FORMAT ---
     Provide the recommendation as a structured JSON object with the following keys:
-
-    1. "action": (String) "BUY", "SELL", or "HOLD".
-    2. "entry_range": (String) The recommended price range for entry (e.g., "65000.00 - 65500.00"). If HOLD, use "N/A".
-    3. "tp1": (Float) Take Profit Target 1 (Realistic short-term target).
-    4. "tp2": (Float) Take Profit Target 2 (Optimistic target).
-    5. "sl": (Float) Stop Loss (Critical risk management level; must be defined for BUY/SELL).
-    6. "confidence": (Float) Confidence score from 0.0 (low confluence) to 1.0 (high confluence).
-    7. "rationale": (String) A concise, 2-3 sentence explanation citing the specific data points supporting the recommendation.
-    """
+""" + TRADE_FORMAT
 
     # Define a safe default return structure
-    default_response = {
-        "action": "HOLD", "entry_range": "N/A", "tp1": 0.0, "tp2": 0.0, "sl": 0.0, "confidence": 0.0,
-        "rationale": "Strategy generation failed."
-    }
+    default_response = default_recommendation()
 
     try:
+        import openai
         client = openai.OpenAI()
-        completion = client.chat.completions.create(
+        response_content = cached_completion(
+            client,
             model="gpt-4-turbo", # Use a capable model for complex analysis
             messages=[
                 {"role": "system", "content": "You are a quantitative trading strategist that provides structured trade setups exclusively in JSON format."},
                 {"role": "user", "content": prompt}
             ],
             response_format={"type": "json_object"},
-            temperature=0.3 # Lower temperature for more deterministic, analytical outputs
+            temperature=0.3, # Lower temperature for more deterministic, analytical outputs
+            # Only well-formed recommendations are cached
+            validate=lambda content: is_valid_recommendation(json.loads(content))
         )
 
-        response_content = completion.choices[0].message.content
         recommendation = json.loads(response_content)
 
         # Validate the output structure
-        required_keys = ["action", "entry_range", "tp1", "tp2", "sl", "confidence", "rationale"]
-        if not all(key in recommendation for key in required_keys):
+        if not is_valid_recommendation(recommendation):
             logger.error(f"   [ERROR] AI response missing required keys. Response: {response_content}")
             default_response["rationale"] = "Strategy generation failed: Invalid JSON structure."
             return default_response
@@ -0,0 +1,49 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# --- Sliding-Window Dataset Builder ---
+# Builds supervised (X, y) windows for sequence models as strided views over
+# the source array, so no per-window copies are made regardless of the
+# look-back length or the amount of history.
+
+def build_windows(data: np.ndarray, look_back_period: int, target_col: int = 0, start: int = None):
+    """
+    Builds look-back windows over a (time,) or (time x features) array.
+    Window i holds rows [t - look_back_period, t) and its target is data[t, target_col],
+    for every t from `start` (default: look_back_period) to the end of the data.
+    Returns:
+        tuple: (X, y) with X of shape (windows, look_back_period, features). Both are
+        read-only views into `data`.
+    """
+    data = np.asarray(data)
+    if data.ndim == 1:
+        data = data[:, None]
+    start = max(start or look_back_period, look_back_period)
+    if start >= len(data):
+        return np.empty((0, look_back_period, data.shape[1])), np.empty((0,))
+    # (windows, features, look_back) -> (windows, look_back, features), still a view
+    X = sliding_window_view(data[start - look_back_period:-1], look_back_period, axis=0).transpose(0, 2, 1)
+    y = data[start:, target_col]
+    return X, y
+
+def build_multi_asset_windows(series: dict, look_back_period: int, target_col: int = 0):
+    """
+    Builds windows for several assets at once from {asset: (time,) or (time x features) array}.
+    Assets may have different history lengths; those too short for one window are skipped.
+    Returns:
+        tuple: (X, y, asset_ids, assets) where asset_ids[i] indexes `assets` for window i.
+        X and y are single contiguous arrays, since windows from different assets have
+        to be stacked for training.
+    """
+    assets, X_parts, y_parts, id_parts = [], [], [], []
+    for asset, data in series.items():
+        X, y = build_windows(data, look_back_period, target_col)
+        if not len(X):
+            continue
+        id_parts.append(np.full(len(X), len(assets)))
+        assets.append(asset)
+        X_parts.append(X)
+        y_parts.append(y)
+    if not assets:
+        return np.empty((0, look_back_period, 1)), np.empty((0,)), np.empty((0,), dtype=int), []
+    return np.concatenate(X_parts), np.concatenate(y_parts), np.concatenate(id_parts), assets